@@ -0,0 +1,86 @@
+"""
+Benchmarks the enrichment paths end to end against mock_discogs_server.py.
+
+    python bench_enrichment.py --rows 500 --latency 0.02 --error-rate 0.05
+    python bench_enrichment.py --mode dashboard --rows 250 --error-rate 0.05
+
+--mode scraper (default) runs discogs_price_scraper.py on a copy of the
+collection CSV (repeated up to --rows) in a scratch directory, so
+data/enriched_collection.csv is never touched. --mode dashboard runs the
+dashboard's live path, fetch_user_collection + enrich_collection_data, on
+a synthesized collection of --rows releases.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+import requests
+
+from mock_discogs_server import MockDiscogs, start_server
+
+def run_scraper(args, base_url):
+    """Returns (rows, seconds) for one discogs_price_scraper.py run on a scratch copy."""
+    df = pd.read_csv(args.csv)
+    reps = -(-args.rows // len(df))
+    df = pd.concat([df] * reps, ignore_index=True).head(args.rows)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        scratch_csv = os.path.join(scratch, "collection.csv")
+        df.to_csv(scratch_csv, index=False)
+
+        env = dict(os.environ, DISCOGS_API_URL=base_url, DISCOGS_REQUEST_DELAY="0",
+                   PRICE_HISTORY_DIR=os.path.join(scratch, "price_history"))
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "discogs_price_scraper.py", scratch_csv],
+                       env=env, check=True, stdout=subprocess.DEVNULL)
+        return len(df), time.perf_counter() - start
+
+def run_dashboard(args, base_url):
+    """Returns (rows, seconds) for the dashboard's fetch + enrich path on a synthesized user."""
+    # The client reads its base URL and delay at import time
+    os.environ.update(DISCOGS_API_URL=base_url, DISCOGS_REQUEST_DELAY="0")
+    from recommender.live_collection import fetch_user_collection, enrich_collection_data
+
+    start = time.perf_counter()
+    releases = fetch_user_collection(args.username)
+    df = enrich_collection_data(releases, delay=0)
+    elapsed = time.perf_counter() - start
+    missing = int(df["Discogs_Lowest_Price"].isna().sum())
+    if missing:
+        print(f"⚠️ {missing} records lost their price (retries exhausted)")
+    return len(df), elapsed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline enrichment benchmark")
+    parser.add_argument("--csv", default="data/enriched_collection.csv")
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--fixtures", default="data/fixtures/discogs")
+    parser.add_argument("--mode", choices=["scraper", "dashboard"], default="scraper")
+    parser.add_argument("--username", default="bench-user", help="Synthesized collection owner (dashboard mode)")
+    args = parser.parse_args()
+
+    mock = MockDiscogs(
+        latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit,
+        error_rate=args.error_rate, fixtures_dir=args.fixtures, seed_csv=args.csv,
+        collection_size=args.rows,
+    )
+    server = start_server(mock, port=0)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    rows, elapsed = (run_dashboard if args.mode == "dashboard" else run_scraper)(args, base_url)
+
+    stats = requests.get(f"{base_url}/_stats").json()
+    server.shutdown()
+
+    print(f"⏱️ {args.mode}: {rows} rows in {elapsed:.2f}s ({rows / elapsed:.1f} rows/s)")
+    print(f"📊 Requests: {stats['requests']}, OK: {stats['ok']}, "
+          f"429s: {stats['rate_limited'] + stats['injected_429']} (injected {stats['injected_429']}), "
+          f"fixture hits: {stats['fixture_hits']}, synthesized: {stats['synthesized']}")
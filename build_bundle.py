@@ -0,0 +1,11 @@
+import sys
+import time
+from recommender.bundle import BUNDLE_DIR, build_bundle
+
+# Usage: python build_bundle.py [collection.csv] [fp16|int8|pq]
+csv_path = sys.argv[1] if len(sys.argv) > 1 else "data/enriched_collection.csv"
+quantization = sys.argv[2] if len(sys.argv) > 2 else None
+
+start = time.perf_counter()
+build_dir = build_bundle(csv_path, BUNDLE_DIR, quantization)
+print(f"📦 Built {build_dir} from {csv_path} in {time.perf_counter() - start:.2f}s")
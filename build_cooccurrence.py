@@ -0,0 +1,26 @@
+import os
+import sys
+from recommender.discogs_client import get_user_collection
+from recommender.cooccurrence import CooccurrenceRecommender
+
+# Usage: python build_cooccurrence.py user1 user2 ...
+# Each run adds to (or refreshes users in) the saved model rather than rebuilding it.
+MODEL_PATH = "data/cooccurrence.npz"
+
+usernames = sys.argv[1:]
+if not usernames:
+    print("Usage: python build_cooccurrence.py <discogs username> [...]")
+    sys.exit(1)
+
+model = CooccurrenceRecommender.load(MODEL_PATH) if os.path.exists(MODEL_PATH) else CooccurrenceRecommender()
+
+for username in usernames:
+    print(f"🔍 Fetching collection for {username}")
+    releases = get_user_collection(username)
+    if not releases:
+        continue
+    model.ingest_collection(username, releases)
+    print(f"✅ Ingested {len(releases)} releases from {username}")
+
+model.save(MODEL_PATH)
+print(f"💾 Saved {len(model.user_items)} collections / {model.n_items} releases to {MODEL_PATH}")
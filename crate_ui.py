@@ -1,13 +1,18 @@
 import os
 import streamlit as st
 import pandas as pd
-import requests
-import time
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from dotenv import load_dotenv
 from streamlit.errors import StreamlitSecretNotFoundError
+from recommender.live_collection import fetch_user_collection, enrich_collection_data
+from recommender.price_history import PriceHistory
+from recommender.jobs import JobManager
+from recommender.recommender import build_attribute_index, filter_mask
+from recommender.hybrid import HybridRanker
+from recommender.bundle import coerce_numeric, precompute_scores, fit_taste_recommender, load_or_build_bundle, source_fingerprint
 
 # --- Configuration & API Setup ---
 load_dotenv()
@@ -135,106 +140,122 @@ def apply_custom_css():
     </style>
     """, unsafe_allow_html=True)
 
-# --- Data Fetching Functions (same as original) ---
-@st.cache_data(ttl=3600, show_spinner="Fetching collection from Discogs...")
-def fetch_user_collection(username):
-    """Fetches all releases from a user's public Discogs collection (Folder 0: All)."""
-    collection = []
-    page = 1
-    while True:
-        url = f"https://api.discogs.com/users/{username}/collection/folders/0/releases?page={page}&per_page=100"
-        res = requests.get(url, headers=HEADERS)
-        if res.status_code != 200:
-            st.error(f"Failed to fetch collection for '{username}'. Is the profile public and spelled correctly?")
-            return None
-        
-        data = res.json()
-        collection.extend(data.get('releases', []))
-        
-        pagination = data.get('pagination', {})
-        if 'next' not in pagination.get('urls', {}) or page >= pagination.get('pages', 1):
-            break
-        page += 1
-        time.sleep(0.5)
-        
-    return collection
-
-@st.cache_data(ttl=3600, show_spinner=False)
-def enrich_collection_data(releases):
-    """Takes a list of release objects and enriches them with market stats."""
-    enriched_records = []
-    progress_bar = st.progress(0, text="Enriching collection with market data...")
-
-    for i, release in enumerate(releases):
-        info = release.get('basic_information', {})
-        
-        stats_url = f"https://api.discogs.com/marketplace/stats/{info.get('id')}"
-        try:
-            stats_res = requests.get(stats_url, headers=HEADERS)
-            stats_data = stats_res.json() if stats_res.status_code == 200 else {}
-        except requests.exceptions.RequestException:
-            stats_data = {}
-
-        record = {
-            "Artist": ", ".join([artist['name'] for artist in info.get('artists', [])]),
-            "Title": info.get('title'),
-            "Discogs_Year": info.get('year'),
-            "Discogs_MasterGenres": ", ".join(info.get('genres', [])) if info.get('genres') else None,
-            "Discogs_Lowest_Price": stats_data.get('lowest_price', {}).get('value'),
-            "Discogs_Num_For_Sale": stats_data.get('num_for_sale'),
-            "Discogs_Want": release.get('community', {}).get('want'),
-            "Discogs_Have": release.get('community', {}).get('have'),
-            "Discogs_MasterID": info.get('master_id'),
-            "Discogs_Thumb": info.get('thumb')
-        }
-        enriched_records.append(record)
-        progress_bar.progress((i + 1) / len(releases), text=f"Enriching: {record['Artist']} - {record['Title']}")
-        time.sleep(0.5)
-
-    progress_bar.empty()
-    return pd.DataFrame(enriched_records)
-
-def run_full_pipeline(username):
+# --- Data Fetching Functions ---
+def run_full_pipeline(username, job=None):
     """Orchestrates the fetching and enriching process for a live user."""
-    releases = fetch_user_collection(username)
+    releases = fetch_user_collection(username, job, headers=HEADERS)
     if releases:
-        df = enrich_collection_data(releases)
-        for col in ["Discogs_Lowest_Price", "Discogs_Want", "Discogs_Have", "Discogs_Num_For_Sale", "Discogs_Year"]:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-        return df
+        return precompute_scores(coerce_numeric(enrich_collection_data(releases, job, headers=HEADERS)))
     return pd.DataFrame()
 
-@st.cache_data
+@st.cache_resource
+def get_job_manager():
+    """One job manager per server process, shared by every session."""
+    return JobManager(max_workers=2, ttl=3600)
+
+SAMPLE_PATH = "data/enriched_collection.csv"
+
+@st.cache_resource(show_spinner="Preparing sample collection...")
+def load_default_bundle(path):
+    """
+    Opens the prebuilt artifact bundle for the sample data, building it if
+    missing or stale. The artifacts the app uses are opened here, so any
+    read failure falls back to the CSV instead of surfacing mid-render.
+    """
+    try:
+        bundle = load_or_build_bundle(path)
+        for artifact in ("collection", "attributes", "recommender", "taste_vector"):
+            getattr(bundle, artifact)
+        return bundle
+    except (OSError, RuntimeError) as e:
+        # faiss reports unreadable index files as RuntimeError
+        print(f"INFO: Could not open artifact bundle ({e}). Loading the CSV directly.")
+        return None
+
 def load_default_data(path):
-    """Loads and prepares the default static data from a CSV file."""
-    df = pd.read_csv(path)
-    for col in ["Discogs_Lowest_Price", "Discogs_Want", "Discogs_Have", "Discogs_Num_For_Sale", "Discogs_Year"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-    return df
+    """Loads the typed, pre-scored sample collection (memory-mapped from the bundle when available)."""
+    bundle = load_default_bundle(path)
+    if bundle is not None:
+        return bundle.collection
+    return precompute_scores(coerce_numeric(pd.read_csv(path)))
+
+@st.cache_data(ttl=3600)
+def load_trend_features():
+    """Loads per-release price slope and want growth from the market snapshot history."""
+    return PriceHistory().trend_features()
+
+@st.cache_resource(max_entries=8, show_spinner="Building taste index...")
+def get_taste_recommender(_df, data_key, _bundle=None):
+    """Taste index and collection taste vector, from the bundle or fitted once per loaded collection."""
+    if _bundle is not None:
+        return _bundle.recommender, _bundle.taste_vector
+    return fit_taste_recommender(_df)
+
+@st.cache_resource(max_entries=8)
+def get_filter_index(_df, data_key, _bundle=None):
+    """Per-record price/year arrays and genre bitsets behind the sidebar filters."""
+    if _bundle is not None:
+        return _bundle.attributes
+    return build_attribute_index(_df)
 
 # --- Enhanced Analytics Functions ---
-def create_collection_overview(df):
-    """Creates overview charts for the collection."""
-    if df.empty:
+@st.cache_data(max_entries=64, show_spinner=False)
+def compute_chart_aggregates(_df, data_key, filter_state, price_bins=30):
+    """
+    Bins prices and counts genres and years with NumPy. Cached per dataset and
+    filter state (the DataFrame itself is not hashed), so Plotly only ever
+    receives fixed-size summaries rather than every record.
+    """
+    prices = _df['Discogs_Lowest_Price'].to_numpy(dtype=float)
+    prices = prices[~np.isnan(prices)]
+    if prices.size:
+        price_counts, price_edges = np.histogram(prices, bins=price_bins)
+    else:
+        price_counts, price_edges = np.zeros(0, dtype=int), np.zeros(1)
+
+    genres = _df['Discogs_MasterGenres'].dropna().to_numpy(dtype=str)
+    genre_labels, genre_counts = np.unique(genres, return_counts=True)
+    top_genres = np.argsort(-genre_counts, kind='stable')[:10]
+
+    years = _df['Discogs_Year'].to_numpy(dtype=float)
+    year_values, year_counts = np.unique(years[~np.isnan(years)], return_counts=True)
+
+    return {
+        "price_centers": (price_edges[:-1] + price_edges[1:]) / 2,
+        "price_widths": np.diff(price_edges),
+        "price_counts": price_counts,
+        "genre_labels": genre_labels[top_genres],
+        "genre_counts": genre_counts[top_genres],
+        "year_values": year_values,
+        "year_counts": year_counts,
+    }
+
+def create_collection_overview(aggregates):
+    """Creates overview charts from pre-aggregated collection summaries."""
+    if aggregates is None:
         return None, None, None
     
     # Price distribution
-    fig_price = px.histogram(
-        df, x="Discogs_Lowest_Price", 
-        title="Price Distribution",
-        color_discrete_sequence=['#667eea']
-    )
+    fig_price = go.Figure(go.Bar(
+        x=aggregates["price_centers"],
+        y=aggregates["price_counts"],
+        width=aggregates["price_widths"],
+        marker_color='#667eea'
+    ))
     fig_price.update_layout(
+        title="Price Distribution",
+        xaxis_title="Discogs_Lowest_Price",
+        yaxis_title="count",
+        bargap=0,
         plot_bgcolor='rgba(0,0,0,0)',
         paper_bgcolor='rgba(0,0,0,0)',
         font=dict(color='#333')
     )
     
     # Genre distribution (top 10)
-    genre_counts = df['Discogs_MasterGenres'].value_counts().head(10)
     fig_genre = px.bar(
-        x=genre_counts.values, 
-        y=genre_counts.index,
+        x=aggregates["genre_counts"], 
+        y=aggregates["genre_labels"],
         orientation='h',
         title="Top 10 Genres",
         color_discrete_sequence=['#764ba2']
@@ -246,10 +267,9 @@ def create_collection_overview(df):
     )
     
     # Year distribution
-    year_counts = df['Discogs_Year'].value_counts().sort_index()
     fig_year = px.line(
-        x=year_counts.index, 
-        y=year_counts.values,
+        x=aggregates["year_values"], 
+        y=aggregates["year_counts"],
         title="Releases by Year",
         color_discrete_sequence=['#ff6b6b']
     )
@@ -390,6 +410,26 @@ def display_crate_summary():
                         use_container_width=True
                     )
 
+def range_slider(label, low, high):
+    """
+    Range slider from low to high, or None (no filter) when the range is
+    empty, as it is for a partial collection whose records share one value.
+    """
+    if pd.isna(low) or pd.isna(high) or int(low) >= int(high):
+        st.caption(f"{label}: not enough spread to filter yet")
+        return None
+    return st.slider(label, int(low), int(high), (int(low), int(high)))
+
+@st.fragment(run_every=2)
+def poll_job(key):
+    """Shows job progress and reruns the app when new records or the final result arrive."""
+    job = get_job_manager().get(key)
+    if job is None:
+        return
+    st.progress(job.fraction, text=job.message)
+    if job.is_finished or len(job.partial) > st.session_state.get("job_rendered", 0):
+        st.rerun()
+
 # --- Main App ---
 st.set_page_config(
     page_title="🎧 NextSpin Crate", 
@@ -436,17 +476,47 @@ with st.container():
         st.markdown("### 📊 Or")
         use_sample = st.button("🎲 Use Sample Data", use_container_width=True)
 
-# Data loading
+# Data loading: live collections are fetched and enriched in the background
+jobs = get_job_manager()
 if submitted and discogs_username:
-    with st.spinner(f"Analyzing {discogs_username}'s collection..."):
-        app_df = run_full_pipeline(discogs_username)
-        st.session_state.username = discogs_username
+    username = discogs_username.strip()
+    # Keyed on the lowercased name so concurrent sessions share one job
+    st.session_state.job_key = username.lower()
+    jobs.submit(st.session_state.job_key, run_full_pipeline, username)
+    st.session_state.username = username
 elif use_sample:
-    app_df = load_default_data("data/enriched_collection.csv")
+    st.session_state.pop("job_key", None)
+
+job = jobs.get(st.session_state.get("job_key"))
+app_df = None
+if job is None:
+    st.session_state.pop("job_key", None)
     st.session_state.username = "Sample Collection"
-else:
-    app_df = load_default_data("data/enriched_collection.csv")
+elif job.status == "failed":
+    st.error(job.error)
+    st.session_state.pop("job_key", None)
     st.session_state.username = "Sample Collection"
+elif job.status == "done":
+    app_df = job.result
+else:
+    # Show whatever has been enriched so far; the poller reruns as more arrives
+    partial = job.snapshot()
+    st.session_state.job_rendered = len(partial)
+    poll_job(st.session_state.job_key)
+    if partial:
+        app_df = precompute_scores(coerce_numeric(pd.DataFrame(partial)))
+    else:
+        st.info(f"Analyzing {st.session_state.username}'s collection in the background. Showing sample data until the first records arrive.")
+
+if app_df is None:
+    app_df = load_default_data(SAMPLE_PATH)
+    active_bundle = load_default_bundle(SAMPLE_PATH)
+    # The bundle build (or the CSV's size and mtime) identifies the sample's contents
+    data_source = ("sample", active_bundle.bundle_dir if active_bundle is not None else str(source_fingerprint(SAMPLE_PATH)))
+else:
+    active_bundle = None
+    # Partial results only grow within one job run, so its id plus the row count is exact
+    data_source = ("live", job.id)
 
 if app_df.empty:
     st.error("Could not load data. Please check your username or ensure the sample data exists.")
@@ -454,6 +524,8 @@ if app_df.empty:
 
 # Store in session state for crate functionality
 st.session_state.app_df = app_df
+# Identifies the loaded data's contents for the per-collection caches
+data_key = (*data_source, len(app_df))
 
 # --- Enhanced Sidebar ---
 with st.sidebar:
@@ -478,17 +550,9 @@ with st.sidebar:
     st.markdown("### 🔍 Filters")
     search_term = st.text_input("🔎 Search", placeholder="Artist or title...")
     
-    # Dynamic ranges
-    max_price_val = app_df['Discogs_Lowest_Price'].fillna(1000).max()
-    min_year_val, max_year_val = int(app_df['Discogs_Year'].dropna().min()), int(app_df['Discogs_Year'].dropna().max())
-    
-    min_price, max_price_select = st.slider(
-        "💰 Price Range ($)", 0, int(max_price_val), (0, int(max_price_val))
-    )
-    
-    min_year_select, max_year_select = st.slider(
-        "📅 Year Range", min_year_val, max_year_val, (min_year_val, max_year_val)
-    )
+    # Dynamic ranges (None while a partial live collection has no spread yet)
+    price_range = range_slider("💰 Price Range ($)", 0, app_df['Discogs_Lowest_Price'].fillna(1000).max())
+    year_range = range_slider("📅 Year Range", app_df['Discogs_Year'].min(), app_df['Discogs_Year'].max())
     
     # Genre filter with search
     unique_genres = sorted(list(app_df['Discogs_MasterGenres'].dropna().unique()))
@@ -506,16 +570,15 @@ with st.sidebar:
     # Crate display
     st.markdown("### 🧺 Your Crate")
 
-# Apply filters
-filtered_df = app_df[
-    (app_df['Discogs_Lowest_Price'] >= min_price) &
-    (app_df['Discogs_Lowest_Price'] <= max_price_select) &
-    (app_df['Discogs_Year'] >= min_year_select) &
-    (app_df['Discogs_Year'] <= max_year_select)
-].copy()
+# Apply filters with the precomputed filter index (same predicates the taste index uses)
+sidebar_filters = {
+    "price": price_range,
+    "year": year_range,
+    "genres": selected_genres
+}
+filter_index = get_filter_index(app_df, data_key, active_bundle)
+filtered_df = app_df[filter_mask(filter_index, sidebar_filters)].copy()
 
-if selected_genres:
-    filtered_df = filtered_df[filtered_df['Discogs_MasterGenres'].isin(selected_genres)]
 if search_term:
     filtered_df = filtered_df[
         filtered_df['Artist'].str.contains(search_term, case=False, na=False) | 
@@ -532,7 +595,9 @@ st.markdown("### 📊 Collection Analytics")
 
 if not filtered_df.empty:
     # Create charts
-    fig_price, fig_genre, fig_year = create_collection_overview(filtered_df)
+    filter_state = (price_range, year_range, tuple(selected_genres), search_term)
+    aggregates = compute_chart_aggregates(filtered_df, data_key, filter_state)
+    fig_price, fig_genre, fig_year = create_collection_overview(aggregates)
     
     chart_cols = st.columns(3)
     with chart_cols[0]:
@@ -547,18 +612,26 @@ if not filtered_df.empty:
 
 # --- Score Computations ---
 if not filtered_df.empty:
-    filtered_df.loc[:, "ValueScore"] = (
-        filtered_df["Discogs_Want"].fillna(1) / (filtered_df["Discogs_Have"].fillna(1) + 1)
-    ) * (1 / (filtered_df["Discogs_Lowest_Price"].fillna(30) * price_weight + 1))
-    
-    filtered_df.loc[:, "SmartBuyScore"] = filtered_df["ValueScore"] * (
-        1 / (filtered_df["Discogs_Num_For_Sale"].fillna(10) + 1)
+    # DemandRatio, SupplyFactor and EssentialScore are precomputed at load time
+    filtered_df.loc[:, "ValueScore"] = filtered_df["DemandRatio"] * (
+        1 / (filtered_df["Discogs_Lowest_Price"].fillna(30) * price_weight + 1)
     )
     
-    filtered_df.loc[:, "EssentialScore"] = filtered_df["Discogs_Want"].fillna(1) / filtered_df["Discogs_Have"].fillna(1)
+    filtered_df.loc[:, "SmartBuyScore"] = filtered_df["ValueScore"] * filtered_df["SupplyFactor"]
+
+    # Momentum from market history: growing demand lifts SmartBuyScore
+    if 'Discogs_Release_ID' in filtered_df.columns:
+        trends = load_trend_features()
+        filtered_df.loc[:, "Want_Growth"] = filtered_df["Discogs_Release_ID"].map(trends["Want_Growth"])
+        filtered_df.loc[:, "Price_Slope"] = filtered_df["Discogs_Release_ID"].map(trends["Price_Slope"])
+        filtered_df.loc[:, "SmartBuyScore"] *= 1 + filtered_df["Want_Growth"].fillna(0).clip(-0.5, 1.0)
     
     if 'Artist' in filtered_df.columns:
-        artist_avg_want = filtered_df.groupby('Artist')['Discogs_Want'].transform('mean')
+        # The precomputed per-artist average applies as-is when no filter narrows the collection
+        if len(filtered_df) == len(app_df):
+            artist_avg_want = filtered_df['ArtistAvgWant']
+        else:
+            artist_avg_want = filtered_df.groupby('Artist')['Discogs_Want'].transform('mean')
         filtered_df.loc[:, 'DeepCutScore'] = (artist_avg_want / filtered_df['Discogs_Want'].fillna(1)) / filtered_df['Discogs_Have'].fillna(1)
     else:
         filtered_df.loc[:, 'DeepCutScore'] = 0
@@ -572,8 +645,8 @@ else:
     st.stop()
 
 # --- Enhanced Tabs ---
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
-    "🎯 Best Value", "💰 Smart Buys", "👑 Essentials", "💎 Deep Cuts", "📊 Data Explorer"
+tab1, tab2, tab3, tab4, tab_hybrid, tab5 = st.tabs([
+    "🎯 Best Value", "💰 Smart Buys", "👑 Essentials", "💎 Deep Cuts", "🎧 For You", "📊 Data Explorer"
 ])
 
 with tab1:
@@ -600,9 +673,28 @@ with tab4:
     if 'Artist' in filtered_df.columns and not top_deep_cuts.empty:
         for i, (_, row) in enumerate(top_deep_cuts.iterrows(), 1):
             avg_want_for_artist = artist_avg_want.loc[row.name]
-            notes = f"Artist's average want: {int(avg_want_for_artist)}"
+            # Collection API entries carry no community stats, so live data may have none
+            notes = f"Artist's average want: {int(avg_want_for_artist)}" if pd.notna(avg_want_for_artist) else None
             display_enhanced_record(row, score_col="DeepCutScore", notes=notes, rank=i)
 
+with tab_hybrid:
+    st.markdown("### 🎧 For You")
+    st.markdown("*Records like yours that are also smart buys*")
+    if 'Discogs_Release_ID' in filtered_df.columns:
+        taste_weight = st.slider(
+            "🎚️ Taste vs. Value", 0.0, 1.0, 0.6, 0.05,
+            help="1.0 ranks purely on taste similarity, 0.0 purely on SmartBuyScore across the filtered collection"
+        )
+        recommender, taste_vector = get_taste_recommender(app_df, data_key, active_bundle)
+        ranker = HybridRanker(recommender)
+        ranker.set_market_scores(filtered_df['Discogs_Release_ID'], filtered_df['SmartBuyScore'])
+        top_hybrid, _ = ranker.rank(taste_vector, top_k=5, taste_weight=taste_weight, filters=sidebar_filters)
+        for i, (_, row) in enumerate(top_hybrid.iterrows(), 1):
+            notes = f"Taste match {row['TasteScore']:.2f} · value percentile {row['MarketPercentile']:.0%}"
+            display_enhanced_record(row, score_col="HybridScore", notes=notes, rank=i)
+    else:
+        st.info("Hybrid picks need Discogs release IDs for this collection.")
+
 with tab5:
     st.markdown("### 📊 Data Explorer")
     st.markdown("*Dive deep into your collection data*")
@@ -1,8 +1,12 @@
+import sys
 import pandas as pd
 import time
-from recommender.discogs_client import get_release_stats
+from recommender.discogs_client import get_release_stats, REQUEST_DELAY
+from recommender.price_history import PriceHistory, STAT_COLS
 
-df = pd.read_csv("data/enriched_collection.csv")
+# Optional path argument lets benchmarks run against a scratch copy
+csv_path = sys.argv[1] if len(sys.argv) > 1 else "data/enriched_collection.csv"
+df = pd.read_csv(csv_path)
 
 # Ensure these columns exist
 cols_to_check = [
@@ -14,6 +18,9 @@ for col in cols_to_check:
         df[col] = pd.NA
     df[col] = pd.to_numeric(df[col], errors="coerce")
 
+# Rows whose stats were actually fetched this run; only these go into the history
+refreshed = []
+
 for idx, row in df.iterrows():
     release_id = row.get("Discogs_Release_ID")
     if pd.isna(release_id):
@@ -37,11 +44,20 @@ for idx, row in df.iterrows():
 
         df.at[idx, "Discogs_Want"] = int(want) if want is not None else pd.NA
         df.at[idx, "Discogs_Have"] = int(have) if have is not None else pd.NA
+        refreshed.append(idx)
 
     except Exception as e:
         print(f"⚠️ Error updating row {idx}: {e}")
 
-    time.sleep(1)
+    time.sleep(REQUEST_DELAY)
+
+df.to_csv(csv_path, index=False)
+print("✅ Enriched CSV saved with price, want, and have info.")
 
-df.to_csv("data/enriched_collection.csv", index=False)
-print("✅ Enriched CSV saved with price, want, and have info.")
\ No newline at end of file
+# Keep this run's market stats as history instead of losing them on the next overwrite.
+# Rows that failed to fetch still hold old values, which must not be stamped as new.
+snapshot_path = PriceHistory().append(df.loc[refreshed, ["Discogs_Release_ID"] + STAT_COLS])
+if snapshot_path:
+    print(f"📈 Market snapshot of {len(refreshed)} refreshed releases appended to {snapshot_path}")
+else:
+    print("📈 No releases refreshed; no market snapshot appended.")
\ No newline at end of file
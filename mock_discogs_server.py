@@ -0,0 +1,291 @@
+"""
+Offline stand-in for the Discogs API.
+
+Serves the endpoints the enrichment scripts and dashboard use so their
+throughput, retry behaviour and caching can be measured without spending
+real API quota:
+
+    python mock_discogs_server.py --port 8765 --latency 0.05 --error-rate 0.1
+    DISCOGS_API_URL=http://localhost:8765 DISCOGS_REQUEST_DELAY=0 python discogs_price_scraper.py scratch.csv
+
+Responses come from recorded fixtures when present (see --record) and are
+otherwise synthesized deterministically from the release ID, seeded with
+the values in --seed-csv where that release exists.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+import requests
+
+UPSTREAM_URL = "https://api.discogs.com"
+GENRES = ["Jazz", "Rock", "Electronic", "Funk / Soul", "Hip Hop", "Folk, World, & Country", "Reggae", "Classical"]
+
+class MockDiscogs:
+    """Shared state for the handler: settings, fixtures, rate-limit window and counters."""
+
+    def __init__(self, latency=0.0, jitter=0.0, rate_limit=60, error_rate=0.0,
+                 fixtures_dir="data/fixtures/discogs", record=False, seed_csv=None,
+                 collection_size=250, random_seed=42):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.fixtures_dir = fixtures_dir
+        self.record = record
+        self.collection_size = collection_size
+        self.random = random.Random(random_seed)
+        self.lock = threading.Lock()
+        self.window = deque()
+        self.stats = {"requests": 0, "ok": 0, "rate_limited": 0, "injected_429": 0,
+                      "fixture_hits": 0, "recorded": 0, "synthesized": 0}
+        self.seed = {}
+        if seed_csv and os.path.exists(seed_csv):
+            seed_df = pd.read_csv(seed_csv).dropna(subset=["Discogs_Release_ID"])
+            for _, row in seed_df.iterrows():
+                self.seed[int(row["Discogs_Release_ID"])] = row
+
+    # --- Rate limiting ---
+    def check_rate_limit(self):
+        """Returns (allowed, used, remaining) for a sliding 60s window."""
+        with self.lock:
+            now = time.monotonic()
+            while self.window and now - self.window[0] > 60:
+                self.window.popleft()
+            self.stats["requests"] += 1
+            if self.rate_limit and len(self.window) >= self.rate_limit:
+                self.stats["rate_limited"] += 1
+                return False, len(self.window), 0
+            if self.error_rate and self.random.random() < self.error_rate:
+                self.stats["injected_429"] += 1
+                return False, len(self.window), max(self.rate_limit - len(self.window), 0)
+            self.window.append(now)
+            used = len(self.window)
+            return True, used, max(self.rate_limit - used, 0) if self.rate_limit else 0
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    # --- Fixtures ---
+    def fixture_path(self, path, query):
+        name = path.strip("/").replace("/", "_") or "root"
+        if query:
+            name += "_" + hashlib.sha1(query.encode()).hexdigest()[:12]
+        return os.path.join(self.fixtures_dir, f"{name}.json")
+
+    def load_fixture(self, path, query):
+        fixture = self.fixture_path(path, query)
+        if os.path.exists(fixture):
+            with open(fixture) as f:
+                return json.load(f)
+        return None
+
+    def record_fixture(self, path, query, headers):
+        """Fetches a response from the real API and stores it as a fixture."""
+        res = requests.get(f"{UPSTREAM_URL}{path}", params=parse_qs(query), headers=headers)
+        if res.status_code != 200:
+            return None
+        os.makedirs(self.fixtures_dir, exist_ok=True)
+        with open(self.fixture_path(path, query), "w") as f:
+            json.dump(res.json(), f)
+        self.count("recorded")
+        return res.json()
+
+    # --- Synthetic responses ---
+    def _rng(self, key):
+        return random.Random(int(hashlib.sha1(str(key).encode()).hexdigest()[:8], 16))
+
+    def release(self, release_id):
+        rng = self._rng(release_id)
+        row = self.seed.get(release_id)
+
+        def seeded(col, default):
+            if row is not None and pd.notna(row.get(col)):
+                return row[col]
+            return default
+
+        genres = str(seeded("Discogs_Genre", rng.choice(GENRES))).split(", ")
+        return {
+            "id": release_id,
+            "title": seeded("Title", f"Mock Release {release_id}"),
+            "artists": [{"name": seeded("Artist", f"Mock Artist {release_id % 997}")}],
+            "year": int(seeded("Discogs_Year", rng.randint(1955, 2024))),
+            "genres": genres,
+            "styles": [],
+            "master_id": int(seeded("Discogs_MasterID", release_id + 1_000_000)),
+            "thumb": seeded("Discogs_Thumb", f"https://i.discogs.com/mock/{release_id}.jpeg"),
+            "lowest_price": float(seeded("Discogs_Lowest_Price", round(rng.uniform(5, 120), 2))),
+            "num_for_sale": int(seeded("Discogs_Num_For_Sale", rng.randint(0, 200))),
+            "community": {
+                "want": int(seeded("Discogs_Want", rng.randint(10, 20000))),
+                "have": int(seeded("Discogs_Have", rng.randint(10, 30000))),
+                "rating": {"average": round(rng.uniform(3, 5), 2), "count": rng.randint(1, 2000)},
+            },
+        }
+
+    def marketplace_stats(self, release_id):
+        release = self.release(release_id)
+        return {
+            "lowest_price": {"value": release["lowest_price"], "currency": "USD"},
+            "num_for_sale": release["num_for_sale"],
+            "blocked_from_sale": False,
+        }
+
+    def search(self, params):
+        terms = " ".join(params.get(key, [""])[0] for key in ("q", "artist", "release_title")).strip()
+        release_id = self._rng(terms.lower()).randint(1, 30_000_000)
+        release = self.release(release_id)
+        result = {
+            "id": release_id,
+            "title": terms or release["title"],
+            "year": str(release["year"]),
+            "genre": release["genres"],
+            "label": [],
+            "master_id": release["master_id"],
+            "thumb": release["thumb"],
+            "community": {"want": release["community"]["want"], "have": release["community"]["have"]},
+        }
+        return {"pagination": {"page": 1, "pages": 1, "per_page": 1, "items": 1, "urls": {}}, "results": [result]}
+
+    def collection(self, username, params):
+        page = int(params.get("page", ["1"])[0])
+        per_page = int(params.get("per_page", ["50"])[0])
+        pages = max(1, -(-self.collection_size // per_page))
+        rng = self._rng(username)
+        ids = [rng.randint(1, 30_000_000) for _ in range(self.collection_size)]
+        releases = []
+        for release_id in ids[(page - 1) * per_page:page * per_page]:
+            release = self.release(release_id)
+            releases.append({
+                "id": release_id,
+                "basic_information": {
+                    "id": release_id,
+                    "title": release["title"],
+                    "year": release["year"],
+                    "artists": release["artists"],
+                    "genres": release["genres"],
+                    "master_id": release["master_id"],
+                    "thumb": release["thumb"],
+                },
+                "community": {"want": release["community"]["want"], "have": release["community"]["have"]},
+            })
+        urls = {"next": f"/users/{username}/collection/folders/0/releases?page={page + 1}&per_page={per_page}"} if page < pages else {}
+        return {
+            "pagination": {"page": page, "pages": pages, "per_page": per_page, "items": self.collection_size, "urls": urls},
+            "releases": releases,
+        }
+
+    def synthesize(self, path, params):
+        parts = path.strip("/").split("/")
+        try:
+            if len(parts) == 2 and parts[0] == "releases":
+                return self.release(int(parts[1]))
+            if len(parts) == 3 and parts[:2] == ["marketplace", "stats"]:
+                return self.marketplace_stats(int(parts[2]))
+            if parts == ["database", "search"]:
+                return self.search(params)
+            if len(parts) == 6 and parts[0] == "users" and parts[2:5] == ["collection", "folders", "0"] and parts[5] == "releases":
+                return self.collection(parts[1], params)
+        except ValueError:
+            return None
+        return None
+
+
+def make_handler(mock):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status, body, used=0, remaining=0, extra_headers=None):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.send_header("X-Discogs-Ratelimit", str(mock.rate_limit))
+            self.send_header("X-Discogs-Ratelimit-Used", str(used))
+            self.send_header("X-Discogs-Ratelimit-Remaining", str(remaining))
+            for key, value in (extra_headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if parsed.path == "/_stats":
+                with mock.lock:
+                    self.send_json(200, dict(mock.stats))
+                return
+
+            delay = mock.latency + (mock.random.uniform(0, mock.jitter) if mock.jitter else 0)
+            if delay:
+                time.sleep(delay)
+
+            allowed, used, remaining = mock.check_rate_limit()
+            if not allowed:
+                self.send_json(429, {"message": "You are making requests too quickly."},
+                               used, remaining, {"Retry-After": "1"})
+                return
+
+            body = mock.load_fixture(parsed.path, parsed.query)
+            if body is not None:
+                mock.count("fixture_hits")
+            elif mock.record:
+                body = mock.record_fixture(parsed.path, parsed.query, {
+                    "User-Agent": self.headers.get("User-Agent", "NextSpinVinylApp/1.0"),
+                    "Authorization": self.headers.get("Authorization", ""),
+                })
+            if body is None:
+                body = mock.synthesize(parsed.path, parse_qs(parsed.query))
+                if body is not None:
+                    mock.count("synthesized")
+
+            if body is None:
+                self.send_json(404, {"message": "The requested resource was not found."}, used, remaining)
+                return
+            mock.count("ok")
+            self.send_json(200, body, used, remaining)
+
+    return Handler
+
+
+def start_server(mock, host="127.0.0.1", port=8765):
+    """Starts the mock in a daemon thread and returns the server (port 0 picks a free one)."""
+    server = ThreadingHTTPServer((host, port), make_handler(mock))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline Discogs API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Base seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds up to this value")
+    parser.add_argument("--rate-limit", type=int, default=60, help="Requests per 60s window, 0 to disable")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of injecting a 429")
+    parser.add_argument("--fixtures", default="data/fixtures/discogs", help="Recorded response directory")
+    parser.add_argument("--record", action="store_true", help="Record missing fixtures from the real API")
+    parser.add_argument("--seed-csv", default="data/enriched_collection.csv")
+    parser.add_argument("--collection-size", type=int, default=250)
+    args = parser.parse_args()
+
+    mock = MockDiscogs(
+        latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit,
+        error_rate=args.error_rate, fixtures_dir=args.fixtures, record=args.record,
+        seed_csv=args.seed_csv, collection_size=args.collection_size,
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(mock))
+    print(f"🎛️ Mock Discogs API listening on http://{args.host}:{args.port} (stats at /_stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 {mock.stats}")
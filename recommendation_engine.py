@@ -1,6 +1,10 @@
+import os
 import pandas as pd
 import numpy as np
 import faiss
+from recommender.quantization import build_index
+from recommender.embedder import build_combo_text
+from recommender.bundle import Bundle, is_fresh
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.preprocessing import StandardScaler
 
@@ -8,30 +12,27 @@ from sklearn.preprocessing import StandardScaler
 df = pd.read_csv("data/enriched_collection.csv")
 
 # Combine text fields for embedding
-df["combo_text"] = (
-    df["Discogs_Genre"].fillna("") + " " +
-    df["Discogs_Style"].fillna("") + " " +
-    df["Discogs_Label"].fillna("")
-)
+df["combo_text"] = build_combo_text(df)
 
-# TF-IDF on combo_text
-vectorizer = TfidfVectorizer()
-X_text = vectorizer.fit_transform(df["combo_text"])
+# Reuse the prebuilt bundle's TF-IDF vocabulary when it matches this CSV
+if is_fresh("data/enriched_collection.csv"):
+    X_text = Bundle().vectorizer.transform(df["combo_text"])
+else:
+    X_text = TfidfVectorizer().fit_transform(df["combo_text"])
 
 # Normalize year column (numeric)
 year_vals = df["Discogs_Year"].fillna(0).astype(float).values.reshape(-1, 1)
 scaler = StandardScaler()
 X_year = scaler.fit_transform(year_vals)
 
-# Combine into a final matrix
-X_full = np.hstack([X_text.toarray(), X_year])
+# Combine into a final float32 matrix (no float64 copy)
+X_full = np.hstack([X_text.astype(np.float32).toarray(), X_year.astype(np.float32)])
 
-# Build Faiss index
-index = faiss.IndexFlatL2(X_full.shape[1])
-index.add(np.array(X_full).astype(np.float32))
+# Build Faiss index; NEXTSPIN_QUANTIZATION=fp16|int8|pq stores compressed codes
+index = build_index(X_full, os.getenv("NEXTSPIN_QUANTIZATION") or None, metric=faiss.METRIC_L2)
 
 def recommend_similar(idx, top_k=5):
-    query_vector = np.array([X_full[idx]]).astype(np.float32)
+    query_vector = X_full[idx:idx + 1]
     distances, indices = index.search(query_vector, top_k + 1)
     recs = df.iloc[indices[0][1:]][["Artist", "Title", "Discogs_Genre", "Discogs_Year"]]
     return recs
@@ -0,0 +1,238 @@
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from recommender.embedder import TasteProfile, build_text_vectorizer
+from recommender.recommender import TasteRecommender, build_attribute_index
+
+BUNDLE_VERSION = 4
+BUNDLE_DIR = "data/bundle"
+
+# A build lock older than this was left by a crashed builder and is broken
+STALE_LOCK_SECONDS = 600
+
+NUMERIC_COLS = [
+    "Discogs_Lowest_Price", "Discogs_Want", "Discogs_Have", "Discogs_Num_For_Sale",
+    "Discogs_Year", "Discogs_Release_ID", "Discogs_MasterID"
+]
+
+def coerce_numeric(df):
+    for col in NUMERIC_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    return df
+
+def precompute_scores(df):
+    """
+    Adds the parts of the dashboard scores that don't depend on the price
+    sensitivity slider or the filters, plus each artist's average want
+    across the whole collection.
+    """
+    want = df["Discogs_Want"].fillna(1)
+    have = df["Discogs_Have"].fillna(1)
+    df["DemandRatio"] = want / (have + 1)
+    df["SupplyFactor"] = 1 / (df["Discogs_Num_For_Sale"].fillna(10) + 1)
+    df["EssentialScore"] = want / have
+    df["ArtistAvgWant"] = df.groupby("Artist")["Discogs_Want"].transform("mean") if "Artist" in df.columns else np.nan
+    return df
+
+def fit_taste_recommender(df, quantization=None):
+    """Fits the dashboard's taste index on Discogs genres/years and returns it with the collection's taste vector."""
+    taste_df = df.assign(
+        Genre=df['Discogs_MasterGenres'].fillna('Unknown'),
+        Year=df['Discogs_Year'].fillna(0).astype(int)
+    )
+    recommender = TasteRecommender()
+    recommender.fit(taste_df, quantization=quantization)
+    return recommender, TasteProfile.from_dataframe(taste_df).vector(recommender.genre_labels)
+
+def source_fingerprint(csv_path):
+    stat = os.stat(csv_path)
+    return {"path": os.path.abspath(csv_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def current_build_dir(bundle_dir=BUNDLE_DIR):
+    """The build directory the CURRENT pointer names, or None before the first build."""
+    try:
+        with open(os.path.join(bundle_dir, "CURRENT")) as f:
+            return os.path.join(bundle_dir, "builds", f.read().strip())
+    except FileNotFoundError:
+        return None
+
+def is_fresh(csv_path, bundle_dir=BUNDLE_DIR, quantization=None):
+    """
+    True when the bundle exists, has the current format version and index
+    quantization, and was built from this CSV as it is now.
+    """
+    build_dir = current_build_dir(bundle_dir)
+    if build_dir is None or not os.path.exists(csv_path):
+        return False
+    try:
+        with open(os.path.join(build_dir, "manifest.json")) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return False
+    return (
+        manifest.get("version") == BUNDLE_VERSION
+        and manifest.get("quantization") == quantization
+        and manifest.get("source") == source_fingerprint(csv_path)
+    )
+
+@contextmanager
+def build_lock(bundle_dir=BUNDLE_DIR, poll=0.2):
+    """Serializes bundle builds across processes with an exclusive-create lock file."""
+    os.makedirs(bundle_dir, exist_ok=True)
+    path = os.path.join(bundle_dir, ".build.lock")
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > STALE_LOCK_SECONDS:
+                    os.remove(path)
+                    continue
+            except FileNotFoundError:
+                continue
+            time.sleep(poll)
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        yield
+    finally:
+        os.close(fd)
+        os.remove(path)
+
+def build_bundle(csv_path, bundle_dir=BUNDLE_DIR, quantization=None):
+    """
+    Parses, types and scores the collection once and writes everything the
+    dashboard needs at startup: one .npy per numeric column (mmap-able),
+    the remaining text columns, filter bitsets, the TF-IDF vectorizer and
+    the faiss index. Builds are serialized by a lock file.
+    """
+    with build_lock(bundle_dir):
+        return _build(csv_path, bundle_dir, quantization)
+
+def _build(csv_path, bundle_dir, quantization):
+    """
+    Writes a new versioned build under builds/ and then atomically replaces
+    the CURRENT pointer, so readers see either the old build or the new
+    one, never a mix. Only the new and the previous build are kept; a
+    reader that resolved the previous one can still finish opening it.
+    """
+    df = precompute_scores(coerce_numeric(pd.read_csv(csv_path)))
+    name = f"{time.time_ns()}-{os.getpid()}"
+    build_dir = os.path.join(bundle_dir, "builds", name)
+    os.makedirs(os.path.join(build_dir, "columns"))
+
+    numeric = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col])]
+    for col in numeric:
+        np.save(os.path.join(build_dir, "columns", f"{col}.npy"), df[col].to_numpy())
+    df.drop(columns=numeric).to_pickle(os.path.join(build_dir, "text_columns.pkl"))
+
+    attributes = build_attribute_index(df)
+    genres = list(attributes["genres"])
+    np.savez(
+        os.path.join(build_dir, "filters.npz"),
+        price=attributes["price"], year=attributes["year"],
+        genre_bits=np.array([attributes["genres"][g] for g in genres]).reshape(len(genres), len(df))
+    )
+
+    vectorizer, _ = build_text_vectorizer(df)
+    pd.to_pickle(vectorizer, os.path.join(build_dir, "vectorizer.pkl"))
+
+    recommender, taste_vector = fit_taste_recommender(df, quantization)
+    recommender.save(os.path.join(build_dir, "recommender"))
+    np.save(os.path.join(build_dir, "taste_vector.npy"), taste_vector)
+
+    with open(os.path.join(build_dir, "manifest.json"), "w") as f:
+        json.dump({
+            "version": BUNDLE_VERSION,
+            "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "source": source_fingerprint(csv_path),
+            "rows": len(df),
+            "columns": list(df.columns),
+            "numeric_columns": numeric,
+            "genres": genres,
+            "quantization": quantization,
+        }, f, indent=2)
+
+    previous = current_build_dir(bundle_dir)
+    pointer = os.path.join(bundle_dir, f"CURRENT.tmp-{os.getpid()}")
+    with open(pointer, "w") as f:
+        f.write(name)
+    os.replace(pointer, os.path.join(bundle_dir, "CURRENT"))
+
+    # Drop older builds, including any left behind by a crashed builder
+    keep = {name, os.path.basename(previous) if previous else None}
+    for old in os.listdir(os.path.join(bundle_dir, "builds")):
+        if old not in keep:
+            shutil.rmtree(os.path.join(bundle_dir, "builds", old), ignore_errors=True)
+    return build_dir
+
+class Bundle:
+    """
+    Read side of a built bundle. The current build is resolved once, here,
+    so every artifact comes from the same build even if a newer one is
+    swapped in later. Each artifact is opened on first access; arrays are
+    memory-mapped.
+    """
+
+    def __init__(self, bundle_dir=BUNDLE_DIR):
+        self.bundle_dir = current_build_dir(bundle_dir)
+        if self.bundle_dir is None:
+            raise FileNotFoundError(f"No bundle has been built in {bundle_dir}")
+        with open(os.path.join(self.bundle_dir, "manifest.json")) as f:
+            self.manifest = json.load(f)
+
+    def _path(self, *parts):
+        return os.path.join(self.bundle_dir, *parts)
+
+    @cached_property
+    def collection(self):
+        text = pd.read_pickle(self._path("text_columns.pkl"))
+        columns = {}
+        for col in self.manifest["columns"]:
+            if col in self.manifest["numeric_columns"]:
+                columns[col] = np.load(self._path("columns", f"{col}.npy"), mmap_mode="r")
+            else:
+                columns[col] = text[col].to_numpy()
+        return pd.DataFrame(columns, copy=False)
+
+    @cached_property
+    def attributes(self):
+        """The same structure recommender.build_attribute_index returns."""
+        with np.load(self._path("filters.npz")) as filters:
+            genre_bits = filters["genre_bits"]
+            return {
+                "size": self.manifest["rows"],
+                "price": filters["price"],
+                "year": filters["year"],
+                "genres": dict(zip(self.manifest["genres"], genre_bits)),
+            }
+
+    @cached_property
+    def vectorizer(self):
+        return pd.read_pickle(self._path("vectorizer.pkl"))
+
+    @cached_property
+    def recommender(self):
+        # Results come from the shared mmap-backed collection, not a pickled copy
+        return TasteRecommender.load(self._path("recommender"), self.collection, mmap=True)
+
+    @cached_property
+    def taste_vector(self):
+        return np.load(self._path("taste_vector.npy"))
+
+def load_or_build_bundle(csv_path, bundle_dir=BUNDLE_DIR, quantization=None):
+    """Opens the bundle for csv_path, rebuilding it first if it is missing or stale."""
+    if not is_fresh(csv_path, bundle_dir, quantization):
+        with build_lock(bundle_dir):
+            # Another worker may have finished the same build while we waited
+            if not is_fresh(csv_path, bundle_dir, quantization):
+                _build(csv_path, bundle_dir, quantization)
+    return Bundle(bundle_dir)
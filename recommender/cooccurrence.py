@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+class CooccurrenceRecommender:
+    """
+    Item-item recommender built from many users' collections.
+
+    Collections form a sparse user x release matrix X; the co-occurrence
+    matrix C = X^T X is kept up to date incrementally. Ingesting a
+    collection adds the outer product of that user's releases (and removes
+    the old one if the user was seen before), so no other user is touched.
+    Scores are cosine-normalized co-occurrence counts.
+    """
+
+    def __init__(self):
+        self.item_index = {}
+        self.item_ids = []
+        self.user_items = {}
+        self.cooccurrence = sp.csr_matrix((0, 0), dtype=np.float32)
+
+    @property
+    def n_items(self):
+        return len(self.item_ids)
+
+    def _item_columns(self, release_ids, grow=True):
+        columns = []
+        for release_id in release_ids:
+            release_id = int(release_id)
+            if release_id not in self.item_index:
+                if not grow:
+                    continue
+                self.item_index[release_id] = len(self.item_ids)
+                self.item_ids.append(release_id)
+            columns.append(self.item_index[release_id])
+        return np.unique(np.array(columns, dtype=np.int64))
+
+    def _outer(self, columns, sign):
+        rows = np.repeat(columns, len(columns))
+        cols = np.tile(columns, len(columns))
+        data = np.full(len(rows), sign, dtype=np.float32)
+        return sp.csr_matrix((data, (rows, cols)), shape=(self.n_items, self.n_items))
+
+    def ingest(self, username, release_ids):
+        """Adds (or replaces) one user's collection in the co-occurrence matrix."""
+        columns = self._item_columns(release_ids)
+        if self.cooccurrence.shape[0] != self.n_items:
+            self.cooccurrence.resize((self.n_items, self.n_items))
+
+        update = self._outer(columns, 1.0)
+        previous = self.user_items.get(username)
+        if previous is not None:
+            update = update - self._outer(previous, 1.0)
+        self.cooccurrence = (self.cooccurrence + update).tocsr()
+        self.cooccurrence.eliminate_zeros()
+        self.user_items[username] = columns
+
+    def ingest_collection(self, username, releases):
+        """Ingests a Discogs collection API response (a list of release objects)."""
+        ids = [r.get('basic_information', {}).get('id', r.get('id')) for r in releases]
+        self.ingest(username, [i for i in ids if i is not None])
+
+    def user_item_matrix(self):
+        """The sparse user x release matrix behind the co-occurrence counts."""
+        usernames = list(self.user_items)
+        rows, cols = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+        for i, username in enumerate(usernames):
+            rows.append(np.full(len(self.user_items[username]), i))
+            cols.append(self.user_items[username])
+        rows, cols = np.concatenate(rows), np.concatenate(cols)
+        matrix = sp.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=(len(usernames), self.n_items))
+        return matrix, usernames
+
+    def recommend(self, release_ids, top_k=5, exclude_owned=True):
+        """
+        Releases most often collected alongside release_ids. Returns a
+        DataFrame of Discogs_Release_ID and the matching scores, like
+        TasteRecommender.recommend.
+        """
+        columns = self._item_columns(release_ids, grow=False)
+        empty = pd.DataFrame({"Discogs_Release_ID": pd.Series(dtype="int64")})
+        if len(columns) == 0 or self.n_items == 0:
+            return empty, np.empty(0, dtype=np.float32)
+
+        popularity = self.cooccurrence.diagonal()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inv_norm = np.where(popularity > 0, 1 / np.sqrt(popularity), 0.0)
+
+        # Sum the cosine-normalized rows of the query items in one sparse product
+        query = sp.csr_matrix((inv_norm[columns], (np.zeros(len(columns), dtype=int), columns)), shape=(1, self.n_items))
+        scores = np.asarray((query @ self.cooccurrence).todense()).ravel() * inv_norm
+        if exclude_owned:
+            scores[columns] = 0.0
+
+        top_k = min(top_k, int((scores > 0).sum()))
+        if top_k == 0:
+            return empty, np.empty(0, dtype=np.float32)
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        ids = np.array(self.item_ids, dtype=np.int64)[top]
+        return pd.DataFrame({"Discogs_Release_ID": ids}), scores[top].astype(np.float32)
+
+    def save(self, path):
+        usernames = list(self.user_items)
+        np.savez_compressed(
+            path,
+            item_ids=np.array(self.item_ids, dtype=np.int64),
+            usernames=np.array(usernames, dtype=str),
+            user_offsets=np.cumsum([0] + [len(self.user_items[u]) for u in usernames]),
+            user_columns=np.concatenate([self.user_items[u] for u in usernames]) if usernames else np.zeros(0, dtype=np.int64),
+            data=self.cooccurrence.data, indices=self.cooccurrence.indices, indptr=self.cooccurrence.indptr,
+        )
+
+    @classmethod
+    def load(cls, path):
+        model = cls()
+        with np.load(path) as saved:
+            model.item_ids = saved["item_ids"].tolist()
+            model.item_index = {item: i for i, item in enumerate(model.item_ids)}
+            offsets = saved["user_offsets"]
+            for i, username in enumerate(saved["usernames"].tolist()):
+                model.user_items[username] = saved["user_columns"][offsets[i]:offsets[i + 1]]
+            n = len(model.item_ids)
+            model.cooccurrence = sp.csr_matrix((saved["data"], saved["indices"], saved["indptr"]), shape=(n, n))
+        return model
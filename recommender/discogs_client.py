@@ -1,18 +1,40 @@
 import os
+import time
 import requests
 
 # Optionally set this via .env or use hardcoded if preferred
 DISCOGS_TOKEN = os.getenv("DISCOGS_TOKEN", "YOUR_DISCOGS_TOKEN_HERE")
 
+# Point at mock_discogs_server.py to run the enrichment scripts offline
+DISCOGS_API_URL = os.getenv("DISCOGS_API_URL", "https://api.discogs.com").rstrip("/")
+
+# Pause between per-release calls in the batch scripts
+REQUEST_DELAY = float(os.getenv("DISCOGS_REQUEST_DELAY", "1"))
+
+MAX_RETRIES = 3
+
 HEADERS = {
     "User-Agent": "NextSpinVinylApp/1.0",
     "Authorization": f"Discogs token={DISCOGS_TOKEN}"
 }
 
+def discogs_get(path, params=None, headers=None):
+    """
+    GETs a Discogs API path, backing off and retrying when rate limited (429).
+    headers replaces the module's token headers (e.g. a token from Streamlit secrets).
+    """
+    url = f"{DISCOGS_API_URL}{path}"
+    for attempt in range(MAX_RETRIES + 1):
+        res = requests.get(url, headers=headers or HEADERS, params=params)
+        if res.status_code != 429 or attempt == MAX_RETRIES:
+            return res
+        retry_after = res.headers.get("Retry-After")
+        time.sleep(float(retry_after) if retry_after else 2 ** attempt)
+    return res
+
 def get_release_stats(release_id):
     try:
-        url = f"https://api.discogs.com/releases/{int(release_id)}"
-        res = requests.get(url, headers=HEADERS)
+        res = discogs_get(f"/releases/{int(release_id)}")
         if res.status_code != 200:
             print(f"❌ Failed to fetch release ID {release_id}: {res.status_code}")
             return None
@@ -20,3 +42,45 @@ def get_release_stats(release_id):
     except Exception as e:
         print(f"⚠️ Exception during fetch for release ID {release_id}: {e}")
         return None
+
+def search_release(title, artist):
+    """Returns the first /database/search release result for an artist and title."""
+    try:
+        res = discogs_get("/database/search", params={
+            "release_title": title, "artist": artist, "type": "release", "per_page": 1, "page": 1
+        })
+        if res.status_code != 200:
+            print(f"❌ Search failed for {artist} - {title}: {res.status_code}")
+            return None
+        results = res.json().get("results", [])
+        return results[0] if results else None
+    except Exception as e:
+        print(f"⚠️ Exception during search for {artist} - {title}: {e}")
+        return None
+
+def get_user_collection(username, headers=None, on_page=None):
+    """
+    Returns every release in a user's public collection (folder 0), or None on
+    failure. on_page(page, pages) is called after each page is fetched.
+    """
+    collection = []
+    page = 1
+    while True:
+        try:
+            res = discogs_get(f"/users/{username}/collection/folders/0/releases",
+                              params={"page": page, "per_page": 100}, headers=headers)
+        except Exception as e:
+            print(f"⚠️ Exception fetching collection for {username}: {e}")
+            return None
+        if res.status_code != 200:
+            print(f"❌ Failed to fetch collection for {username}: {res.status_code}")
+            return None
+        data = res.json()
+        collection.extend(data.get("releases", []))
+        pages = data.get("pagination", {}).get("pages", 1)
+        if on_page is not None:
+            on_page(page, pages)
+        if page >= pages:
+            return collection
+        page += 1
+        time.sleep(REQUEST_DELAY)
@@ -1,4 +1,6 @@
 import os
+import time
+from collections import Counter
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import MultiLabelBinarizer
@@ -25,10 +27,137 @@ def build_year_embedding(years):
     """Normalizes years to 0–1 scale."""
     min_year = years.min()
     max_year = years.max()
+    if max_year == min_year:
+        return np.zeros((len(years), 1))
     return ((years - min_year) / (max_year - min_year)).values.reshape(-1, 1)
 
+def build_combo_text(df):
+    """Combines the Discogs genre, style and label fields for text embedding."""
+    return (
+        df["Discogs_Genre"].fillna("") + " " +
+        df["Discogs_Style"].fillna("") + " " +
+        df["Discogs_Label"].fillna("")
+    )
+
+def build_text_vectorizer(df):
+    """Fits TF-IDF on the combined Discogs text fields."""
+    vectorizer = TfidfVectorizer()
+    return vectorizer, vectorizer.fit_transform(build_combo_text(df))
+
 def build_taste_profile(df):
-    genre_matrix, genre_labels = build_genre_embedding(df['Genre'])
-    year_vector = build_year_embedding(df['Year'])
-    taste_vector = np.hstack([genre_matrix, year_vector])
-    return taste_vector.mean(axis=0), genre_labels
+    profile = TasteProfile.from_dataframe(df)
+    return profile.vector(), np.array(profile.labels, dtype=object)
+
+def _to_seconds(timestamp):
+    if timestamp is None:
+        return time.time()
+    if isinstance(timestamp, (int, float, np.number)):
+        return float(timestamp)
+    return pd.Timestamp(timestamp).timestamp()
+
+class TasteProfile:
+    """
+    Running mean of the genre multi-hot + normalized year vectors.
+
+    Keeps per-genre weight sums, a weighted year sum and a year histogram,
+    so add() and remove() cost O(d) instead of recomputing over the whole
+    collection. With half_life_days set, each record is weighted by
+    2^(age / half_life) relative to a reference time; the mean is a ratio,
+    so older records decay without ever being revisited.
+    """
+
+    def __init__(self, half_life_days=None):
+        self.decay = np.log(2) / (half_life_days * 86400) if half_life_days else 0.0
+        self.genre_index = {}
+        self.genre_sums = np.zeros(0)
+        self.year_sum = 0.0
+        self.total_weight = 0.0
+        self.year_counts = Counter()
+        self.count = 0
+        self.t0 = None
+
+    @classmethod
+    def from_dataframe(cls, df, date_col=None, half_life_days=None):
+        profile = cls(half_life_days=half_life_days)
+        dates = df[date_col] if date_col else [None] * len(df)
+        for genres, year, added in zip(df['Genre'], df['Year'], dates):
+            profile.add(genres, year, added)
+        return profile
+
+    @property
+    def labels(self):
+        return sorted(self.genre_index)
+
+    def _weight(self, timestamp):
+        if not self.decay:
+            return 1.0
+        t = _to_seconds(timestamp)
+        if self.t0 is None:
+            self.t0 = t
+        # Rebase before the growth factor overflows
+        if self.decay * (t - self.t0) > 50:
+            scale = np.exp(-self.decay * (t - self.t0))
+            self.genre_sums *= scale
+            self.year_sum *= scale
+            self.total_weight *= scale
+            self.t0 = t
+        return float(np.exp(self.decay * (t - self.t0)))
+
+    def _genre_columns(self, genres, grow=True):
+        columns = []
+        for genre in set(str(genres).split(',')):
+            if genre not in self.genre_index:
+                if not grow:
+                    raise ValueError(f"No '{genre}' record in the taste profile")
+                self.genre_index[genre] = len(self.genre_index)
+                self.genre_sums = np.append(self.genre_sums, 0.0)
+            columns.append(self.genre_index[genre])
+        return columns
+
+    def add(self, genres, year, timestamp=None):
+        """Adds one record; timestamp is when it was acquired (defaults to now)."""
+        columns = self._genre_columns(genres)
+        weight = self._weight(timestamp)
+        self.genre_sums[columns] += weight
+        self.year_sum += weight * year
+        self.total_weight += weight
+        self.year_counts[year] += 1
+        self.count += 1
+
+    def remove(self, genres, year, timestamp=None):
+        """Removes a record previously added with the same genres, year and timestamp."""
+        if self.year_counts[year] == 0:
+            raise ValueError(f"No record from {year} in the taste profile")
+        columns = self._genre_columns(genres, grow=False)
+        weight = self._weight(timestamp)
+        self.genre_sums[columns] -= weight
+        self.year_sum -= weight * year
+        self.total_weight -= weight
+        self.year_counts[year] -= 1
+        if self.year_counts[year] == 0:
+            del self.year_counts[year]
+        self.count -= 1
+        if self.count == 0:
+            # Clear accumulated floating-point drift
+            self.genre_sums[:] = 0.0
+            self.year_sum = self.total_weight = 0.0
+
+    def vector(self, labels=None):
+        """
+        Returns the taste vector as genre means followed by the normalized
+        year mean. Pass labels (e.g. a fitted recommender's genre classes)
+        to align the genre columns; unknown labels get 0.
+        """
+        labels = self.labels if labels is None else labels
+        # Records dozens of half-lives older than the rest round away to nothing
+        if self.count == 0 or self.total_weight <= 0:
+            return np.zeros(len(labels) + 1)
+        genre_means = np.clip(self.genre_sums / self.total_weight, 0.0, 1.0)
+        genre_part = np.array([
+            genre_means[self.genre_index[label]] if label in self.genre_index else 0.0
+            for label in labels
+        ])
+        min_year, max_year = min(self.year_counts), max(self.year_counts)
+        mean_year = self.year_sum / self.total_weight
+        year_part = 0.0 if max_year == min_year else (mean_year - min_year) / (max_year - min_year)
+        return np.append(genre_part, year_part)
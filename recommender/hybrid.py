@@ -0,0 +1,70 @@
+import numpy as np
+
+class HybridRanker:
+    """
+    Ranks "records like mine that are also good buys". Candidates are
+    over-fetched from a fitted TasteRecommender's index, their market scores
+    are gathered from an array pre-aligned to the index rows by release ID,
+    and the two are fused as a weighted sum in one vectorized pass.
+    """
+
+    def __init__(self, recommender, overfetch=10):
+        self.recommender = recommender
+        self.overfetch = overfetch
+        self.market = np.full(recommender.index.ntotal, np.nan)
+
+    def set_market_scores(self, release_ids, scores):
+        """
+        Aligns market scores (e.g. SmartBuyScore) to the index rows by release
+        ID with a sorted searchsorted lookup. Scores are converted to
+        percentile ranks so they fuse on the same 0–1 scale as similarity.
+        Rows with no score are left out of hybrid results.
+        """
+        ids = np.asarray(release_ids, dtype="float64")
+        scores = np.asarray(scores, dtype="float64")
+        valid = ~np.isnan(ids) & ~np.isnan(scores)
+        ids, scores = ids[valid].astype("int64"), scores[valid]
+
+        self.market = np.full(self.recommender.index.ntotal, np.nan)
+        if len(ids) == 0:
+            return
+        pct = np.empty(len(scores))
+        pct[np.argsort(scores, kind="stable")] = np.arange(1, len(scores) + 1) / len(scores)
+
+        order = np.argsort(ids, kind="stable")
+        sorted_ids, sorted_pct = ids[order], pct[order]
+        index_ids = self.recommender.release_ids
+        known = ~np.isnan(index_ids)
+        lookup = np.where(known, index_ids, -1).astype("int64")
+        pos = np.clip(np.searchsorted(sorted_ids, lookup), 0, len(sorted_ids) - 1)
+        hit = known & (sorted_ids[pos] == lookup)
+        self.market[hit] = sorted_pct[pos[hit]]
+
+    def rank(self, taste_vector, top_k=5, taste_weight=0.6, filters=None):
+        """
+        Returns (records, HybridScore) for the top_k fused candidates. The
+        over-fetched pool grows until no record outside it could outscore
+        the top_k (its similarity is at most the pool's lowest and its
+        percentile at most 1), so low taste weights still rank the whole
+        filtered collection by market score.
+        """
+        pool = top_k * self.overfetch
+        while True:
+            D, I = self.recommender.search(taste_vector, pool, filters)
+            exhausted = pool == 0 or len(I) < pool
+            bound = taste_weight * (D[-1] if len(D) else 0.0) + (1 - taste_weight)
+
+            market = self.market[I]
+            keep = ~np.isnan(market)
+            D, I, market = D[keep], I[keep], market[keep]
+            fused = taste_weight * D + (1 - taste_weight) * market
+            order = np.argsort(-fused, kind="stable")[:top_k]
+            if exhausted or (len(order) == top_k and fused[order[-1]] >= bound):
+                break
+            pool *= 4
+
+        records = self.recommender.collection_df.iloc[I[order]].copy()
+        records["TasteScore"] = D[order]
+        records["MarketPercentile"] = market[order]
+        records["HybridScore"] = fused[order]
+        return records, fused[order]
@@ -0,0 +1,90 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+class Job:
+    """A background task's status, progress and (partial) results, safe to poll from any thread."""
+
+    def __init__(self, key):
+        self.key = key
+        # Unique per run, unlike key: a resubmitted or expired key gets a new job
+        self.id = uuid.uuid4().hex
+        self.status = "queued"
+        self.done = 0
+        self.total = 0
+        self.message = "Queued..."
+        self.partial = []
+        self.result = None
+        self.error = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def report(self, done, total, message=""):
+        with self._lock:
+            self.done, self.total, self.message = done, total, message
+
+    def add_partial(self, item):
+        with self._lock:
+            self.partial.append(item)
+
+    def snapshot(self):
+        """Returns a copy of the partial results gathered so far."""
+        with self._lock:
+            return list(self.partial)
+
+    @property
+    def fraction(self):
+        return self.done / self.total if self.total else 0.0
+
+    @property
+    def is_finished(self):
+        return self.status in ("done", "failed")
+
+class JobManager:
+    """
+    Runs jobs on a thread pool outside the Streamlit rerun loop. Jobs are
+    keyed, so submitting a key that is already in flight (or finished
+    within `ttl` seconds) returns the existing job instead of repeating
+    the work. Failed jobs can be resubmitted.
+    """
+
+    def __init__(self, max_workers=2, ttl=3600):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="nextspin-job")
+        self.ttl = ttl
+        self.jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn, *args):
+        """Schedules fn(*args, job) under key unless an equivalent job exists."""
+        with self._lock:
+            self._prune()
+            job = self.jobs.get(key)
+            if job is not None and job.status != "failed":
+                return job
+            job = Job(key)
+            self.jobs[key] = job
+        self.executor.submit(self._run, job, fn, args)
+        return job
+
+    def get(self, key):
+        with self._lock:
+            return self.jobs.get(key)
+
+    def _prune(self):
+        now = time.time()
+        expired = [key for key, job in self.jobs.items()
+                   if job.finished_at is not None and now - job.finished_at > self.ttl]
+        for key in expired:
+            del self.jobs[key]
+
+    def _run(self, job, fn, args):
+        job.status = "running"
+        try:
+            job.result = fn(*args, job)
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
@@ -0,0 +1,54 @@
+import time
+import pandas as pd
+import requests
+from recommender.discogs_client import discogs_get, get_user_collection
+
+# Pause between marketplace stats calls while enriching a live collection
+ENRICH_DELAY = 0.5
+
+# These run on JobManager worker threads, so they report through the job
+# object instead of calling Streamlit directly.
+def fetch_user_collection(username, job=None, headers=None):
+    """Fetches all releases from a user's public Discogs collection (Folder 0: All)."""
+    def on_page(page, pages):
+        if job is not None:
+            job.report(page, pages, f"Fetching collection page {page} of {pages}...")
+
+    collection = get_user_collection(username, headers=headers, on_page=on_page)
+    if collection is None:
+        raise RuntimeError(f"Failed to fetch collection for '{username}'. Is the profile public and spelled correctly?")
+    return collection
+
+def enrich_collection_data(releases, job=None, headers=None, delay=ENRICH_DELAY):
+    """Takes a list of release objects and enriches them with market stats."""
+    enriched_records = []
+
+    for i, release in enumerate(releases):
+        info = release.get('basic_information', {})
+
+        try:
+            stats_res = discogs_get(f"/marketplace/stats/{info.get('id')}", headers=headers)
+            stats_data = stats_res.json() if stats_res.status_code == 200 else {}
+        except requests.exceptions.RequestException:
+            stats_data = {}
+
+        record = {
+            "Artist": ", ".join([artist['name'] for artist in info.get('artists', [])]),
+            "Title": info.get('title'),
+            "Discogs_Year": info.get('year'),
+            "Discogs_MasterGenres": ", ".join(info.get('genres', [])) if info.get('genres') else None,
+            "Discogs_Lowest_Price": (stats_data.get('lowest_price') or {}).get('value'),
+            "Discogs_Num_For_Sale": stats_data.get('num_for_sale'),
+            "Discogs_Want": release.get('community', {}).get('want'),
+            "Discogs_Have": release.get('community', {}).get('have'),
+            "Discogs_Release_ID": info.get('id'),
+            "Discogs_MasterID": info.get('master_id'),
+            "Discogs_Thumb": info.get('thumb')
+        }
+        enriched_records.append(record)
+        if job is not None:
+            job.add_partial(record)
+            job.report(i + 1, len(releases), f"Enriching: {record['Artist']} - {record['Title']}")
+        time.sleep(delay)
+
+    return pd.DataFrame(enriched_records)
@@ -0,0 +1,86 @@
+import itertools
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+
+class MissingLinks:
+    """
+    Finds the taste clusters in a collection with mini-batch k-means and
+    recommends records that sit between them. Centroids are updated with
+    partial_fit, so adding records never re-clusters the whole collection.
+    """
+
+    def __init__(self, n_clusters=5, batch_size=256, random_state=42):
+        self.n_clusters = n_clusters
+        self.batch_size = batch_size
+        self.random_state = random_state
+        self.kmeans = None
+
+    def fit(self, recommender):
+        """Clusters every vector already held in a fitted TasteRecommender's index."""
+        self.kmeans = None
+        vectors = recommender.index.reconstruct_n(0, recommender.index.ntotal)
+        for start in range(0, len(vectors), self.batch_size):
+            self._partial_fit(vectors[start:start + self.batch_size])
+        return self
+
+    def add_records(self, recommender, df):
+        """
+        Adds new records to the recommender's index (see TasteRecommender.add)
+        and moves the centroids towards them, so they can be returned as
+        bridges and the midpoints stay in step with what the index holds.
+        """
+        self._partial_fit(recommender.add(df))
+        return self
+
+    def _partial_fit(self, vectors):
+        if len(vectors) == 0:
+            return
+        if self.kmeans is None:
+            # The first batch has to hold at least one sample per cluster
+            self.kmeans = MiniBatchKMeans(
+                n_clusters=min(self.n_clusters, len(vectors)),
+                batch_size=self.batch_size,
+                random_state=self.random_state,
+                n_init=3,
+            )
+        self.kmeans.partial_fit(vectors)
+
+    @property
+    def centroids(self):
+        if self.kmeans is None:
+            return np.empty((0, 0), dtype='float32')
+        return self.kmeans.cluster_centers_.astype('float32')
+
+    def bridge_points(self):
+        """Returns (cluster pairs, midpoint vectors) for every pair of centroids."""
+        centroids = self.centroids
+        pairs = list(itertools.combinations(range(len(centroids)), 2))
+        if not pairs:
+            return pairs, np.empty((0, centroids.shape[1]), dtype='float32')
+        left, right = np.array(pairs).T
+        return pairs, (centroids[left] + centroids[right]) / 2
+
+    def recommend(self, recommender, top_k=5, filters=None):
+        """Records closest to the midpoints between taste clusters, best bridge first."""
+        pairs, midpoints = self.bridge_points()
+        positions, scores, bridges = [], [], []
+        for (a, b), midpoint in zip(pairs, midpoints):
+            D, I = recommender.search(midpoint, top_k=top_k, filters=filters)
+            positions.append(I)
+            scores.append(D)
+            bridges += [f"{a}-{b}"] * len(I)
+
+        if not positions:
+            return pd.DataFrame()
+        positions, scores, bridges = np.concatenate(positions), np.concatenate(scores), np.array(bridges)
+        # A record can bridge several pairs; keep its best one. Dedupe on the
+        # index position, since DataFrame labels are not guaranteed unique.
+        order = np.argsort(-scores, kind="stable")
+        _, first = np.unique(positions[order], return_index=True)
+        best = order[np.sort(first)][:top_k]
+
+        links = recommender.collection_df.iloc[positions[best]].copy()
+        links["BridgeScore"] = scores[best]
+        links["Bridges"] = bridges[best]
+        return links
@@ -0,0 +1,131 @@
+import os
+import glob
+import numpy as np
+import pandas as pd
+
+HISTORY_DIR = os.getenv("PRICE_HISTORY_DIR", "data/price_history")
+
+STAT_COLS = ["Discogs_Lowest_Price", "Discogs_Num_For_Sale", "Discogs_Want", "Discogs_Have"]
+
+class PriceHistory:
+    """
+    Append-only store of per-release market snapshots.
+
+    Every append() writes one immutable, compressed columnar partition:
+    release IDs sorted and delta-encoded, the snapshot timestamp run-length
+    encoded (one value, one run), prices as float32 and counts as int32
+    with -1 for missing. Nothing is ever rewritten, so each scraper run
+    adds history instead of overwriting it.
+    """
+
+    def __init__(self, root=HISTORY_DIR):
+        self.root = root
+
+    def append(self, df, timestamp=None):
+        """Stores one snapshot of the Discogs_Release_ID + STAT_COLS columns in df."""
+        ts = pd.Timestamp.now(tz="UTC") if timestamp is None else pd.Timestamp(timestamp)
+        if ts.tzinfo is None:
+            ts = ts.tz_localize("UTC")
+
+        snap = df.dropna(subset=["Discogs_Release_ID"])
+        snap = snap.assign(Discogs_Release_ID=snap["Discogs_Release_ID"].astype("int64"))
+        snap = snap.sort_values("Discogs_Release_ID").drop_duplicates("Discogs_Release_ID", keep="last")
+        if snap.empty:
+            return None
+
+        ids = snap["Discogs_Release_ID"].to_numpy()
+
+        def column(col):
+            if col not in snap:
+                return pd.Series(np.nan, index=snap.index)
+            return pd.to_numeric(snap[col], errors="coerce")
+
+        os.makedirs(self.root, exist_ok=True)
+        path, f = self._create_partition(ts.strftime('%Y%m%dT%H%M%S%f'))
+        with f:
+            np.savez_compressed(
+                f,
+                release_id_delta=np.diff(ids, prepend=0),
+                timestamp_runs=np.array([[ts.value, len(ids)]], dtype="int64"),
+                price=column("Discogs_Lowest_Price").to_numpy(dtype="float32"),
+                num_for_sale=column("Discogs_Num_For_Sale").fillna(-1).to_numpy(dtype="int32"),
+                want=column("Discogs_Want").fillna(-1).to_numpy(dtype="int32"),
+                have=column("Discogs_Have").fillna(-1).to_numpy(dtype="int32"),
+            )
+        return path
+
+    def _create_partition(self, stamp):
+        """
+        Opens a new partition file in exclusive-create mode so an existing one
+        is never replaced; snapshots sharing a timestamp get a numbered suffix
+        that sorts after the first.
+        """
+        n = 0
+        while True:
+            name = f"{stamp}.npz" if n == 0 else f"{stamp}_{n:04d}.npz"
+            path = os.path.join(self.root, name)
+            try:
+                return path, open(path, "xb")
+            except FileExistsError:
+                n += 1
+
+    def load(self):
+        """Decodes every partition into flat numpy columns (timestamps in ns)."""
+        parts = {key: [] for key in ["release_id", "timestamp", "price", "num_for_sale", "want", "have"]}
+        for path in sorted(glob.glob(os.path.join(self.root, "*.npz"))):
+            with np.load(path) as part:
+                parts["release_id"].append(np.cumsum(part["release_id_delta"]))
+                runs = part["timestamp_runs"]
+                parts["timestamp"].append(np.repeat(runs[:, 0], runs[:, 1]))
+                for key in ["price", "num_for_sale", "want", "have"]:
+                    parts[key].append(part[key])
+        if not parts["release_id"]:
+            return None
+        return {key: np.concatenate(values) for key, values in parts.items()}
+
+    def trend_features(self):
+        """
+        Per-release momentum in one vectorized pass: least-squares price
+        slope ($/day), relative want growth between the first and latest
+        snapshot, and the snapshot count. Indexed by release ID.
+        """
+        history = self.load()
+        if history is None:
+            return pd.DataFrame(columns=["Price_Slope", "Want_Growth", "Snapshots"])
+
+        release_ids, group = np.unique(history["release_id"], return_inverse=True)
+        n_groups = len(release_ids)
+        days = (history["timestamp"] - history["timestamp"].min()) / 86_400e9
+
+        # Grouped least-squares slope from bincount sums
+        priced = ~np.isnan(history["price"])
+        g, x, y = group[priced], days[priced], history["price"][priced].astype("float64")
+        n = np.bincount(g, minlength=n_groups)
+        sx = np.bincount(g, x, n_groups)
+        sy = np.bincount(g, y, n_groups)
+        sxy = np.bincount(g, x * y, n_groups)
+        sxx = np.bincount(g, x * x, n_groups)
+        denom = n * sxx - sx * sx
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slope = np.where(denom > 0, (n * sxy - sx * sy) / denom, np.nan)
+
+        # First and latest want per release: sort by (release, time) and take the ends
+        wanted = history["want"] >= 0
+        g, t, want = group[wanted], history["timestamp"][wanted], history["want"][wanted]
+        order = np.lexsort((t, g))
+        g, want = g[order], want[order]
+        first_want = np.full(n_groups, np.nan)
+        last_want = np.full(n_groups, np.nan)
+        if len(g):
+            starts = np.flatnonzero(np.r_[True, g[1:] != g[:-1]])
+            ends = np.r_[starts[1:], len(g)] - 1
+            first_want[g[starts]] = want[starts]
+            last_want[g[ends]] = want[ends]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            growth = np.where(first_want > 0, (last_want - first_want) / first_want, np.nan)
+
+        return pd.DataFrame({
+            "Price_Slope": slope,
+            "Want_Growth": growth,
+            "Snapshots": np.bincount(group, minlength=n_groups),
+        }, index=pd.Index(release_ids, name="Discogs_Release_ID"))
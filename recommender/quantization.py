@@ -0,0 +1,96 @@
+import time
+import numpy as np
+import pandas as pd
+import faiss
+
+QUANTIZATIONS = [None, "fp16", "int8", "pq"]
+
+# Memory-map flat/SQ/PQ code arrays instead of copying them into each process
+MMAP_FLAGS = faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+
+def _pq_subquantizers(d, max_m=16):
+    """Largest divisor of d no bigger than max_m (PQ needs d % M == 0)."""
+    return max(m for m in range(1, min(d, max_m) + 1) if d % m == 0)
+
+def build_index(vectors, quantization=None, metric=faiss.METRIC_INNER_PRODUCT):
+    """
+    Builds a faiss index over float32 vectors. quantization is None (exact
+    float32), "fp16", "int8" (scalar quantized) or "pq" (product quantized
+    codes, 8 bits per sub-vector or fewer for small collections).
+    """
+    vectors = np.ascontiguousarray(vectors, dtype='float32')
+    n, d = vectors.shape
+    if quantization is None:
+        index = faiss.IndexFlatIP(d) if metric == faiss.METRIC_INNER_PRODUCT else faiss.IndexFlatL2(d)
+    elif quantization == "fp16":
+        index = faiss.IndexScalarQuantizer(d, faiss.ScalarQuantizer.QT_fp16, metric)
+    elif quantization == "int8":
+        index = faiss.IndexScalarQuantizer(d, faiss.ScalarQuantizer.QT_8bit, metric)
+    elif quantization == "pq":
+        # A single inverted list makes this an exhaustive scan over PQ codes;
+        # unlike IndexPQ, IVF indexes accept ID selectors for filtered search.
+        # Each sub-quantizer needs more training points than centroids.
+        nbits = int(max(1, min(8, np.floor(np.log2(max(n, 2))))))
+        coarse = faiss.IndexFlatIP(d) if metric == faiss.METRIC_INNER_PRODUCT else faiss.IndexFlatL2(d)
+        index = faiss.IndexIVFPQ(coarse, d, 1, _pq_subquantizers(d), nbits, metric)
+    else:
+        raise ValueError(f"Unknown quantization '{quantization}', expected one of {QUANTIZATIONS}")
+
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    return index
+
+def save_index(index, path):
+    faiss.write_index(index, path)
+
+def load_index(path, mmap=True):
+    """Opens a saved index; with mmap the codes are shared page cache, not per-process copies."""
+    return faiss.read_index(path, MMAP_FLAGS) if mmap else faiss.read_index(path)
+
+def index_size_bytes(index):
+    return faiss.serialize_index(index).nbytes
+
+def quantization_report(vectors, top_k=10, n_queries=100, metric=faiss.METRIC_INNER_PRODUCT, seed=42):
+    """
+    Compares each quantization against the exact float32 index on queries
+    sampled from the vectors: index size, recall@k of the exact neighbours,
+    mean absolute score error and query time.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype='float32')
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.choice(len(vectors), size=min(n_queries, len(vectors)), replace=False)]
+    top_k = min(top_k, len(vectors))
+
+    baseline = build_index(vectors, None, metric)
+    base_D, base_I = baseline.search(queries, top_k)
+
+    rows = []
+    for quantization in QUANTIZATIONS:
+        index = baseline if quantization is None else build_index(vectors, quantization, metric)
+        start = time.perf_counter()
+        D, I = index.search(queries, top_k)
+        elapsed = time.perf_counter() - start
+        recall = np.mean([len(np.intersect1d(a, b)) / top_k for a, b in zip(I, base_I)])
+        rows.append({
+            "quantization": quantization or "float32",
+            "size_bytes": index_size_bytes(index),
+            f"recall@{top_k}": recall,
+            "score_mae": float(np.abs(D - base_D).mean()),
+            "query_ms": 1000 * elapsed / len(queries),
+        })
+    report = pd.DataFrame(rows)
+    report["compression"] = report["size_bytes"].iloc[0] / report["size_bytes"]
+    return report
+
+if __name__ == "__main__":
+    import sys
+    from recommender.embedder import load_collection, build_genre_embedding, build_year_embedding
+
+    # Usage: python -m recommender.quantization [collection.csv]
+    df = load_collection(sys.argv[1] if len(sys.argv) > 1 else "data/enriched_collection.csv")
+    genre_matrix, _ = build_genre_embedding(df['Genre'])
+    vectors = np.hstack([genre_matrix, build_year_embedding(df['Year'])]).astype('float32')
+    faiss.normalize_L2(vectors)
+    print(f"📐 {len(vectors)} vectors x {vectors.shape[1]} dims, accuracy vs float32 baseline:\n")
+    print(quantization_report(vectors).round(4).to_string(index=False))
@@ -1,27 +1,185 @@
+import os
 import pandas as pd
 import numpy as np
 import faiss
 from recommender.embedder import build_genre_embedding, build_year_embedding
+from recommender.quantization import build_index, save_index, load_index
+
+# Columns the dashboard sidebar filters on
+PRICE_COL = "Discogs_Lowest_Price"
+YEAR_COL = "Discogs_Year"
+GENRE_COL = "Discogs_MasterGenres"
+
+def build_attribute_index(df):
+    """Precomputes the per-record arrays and genre bitsets used to filter searches."""
+    n = len(df)
+    price = pd.to_numeric(df[PRICE_COL], errors="coerce") if PRICE_COL in df else pd.Series(np.nan, index=df.index)
+    year = pd.to_numeric(df[YEAR_COL], errors="coerce") if YEAR_COL in df else pd.Series(np.nan, index=df.index)
+    genres = df[GENRE_COL] if GENRE_COL in df else pd.Series(None, index=df.index, dtype=object)
+
+    genre_bits = {}
+    codes, labels = pd.factorize(genres)
+    for code, label in enumerate(labels):
+        genre_bits[label] = codes == code
+
+    return {
+        "size": n,
+        "price": price.to_numpy(dtype="float64"),
+        "year": year.to_numpy(dtype="float64"),
+        "genres": genre_bits,
+    }
+
+def filter_mask(attributes, filters):
+    """Boolean mask of records matching the price/year ranges and genre list in `filters`."""
+    mask = np.ones(attributes["size"], dtype=bool)
+    if filters.get("price") is not None:
+        low, high = filters["price"]
+        mask &= (attributes["price"] >= low) & (attributes["price"] <= high)
+    if filters.get("year") is not None:
+        low, high = filters["year"]
+        mask &= (attributes["year"] >= low) & (attributes["year"] <= high)
+    if filters.get("genres"):
+        genre_mask = np.zeros(attributes["size"], dtype=bool)
+        for genre in filters["genres"]:
+            if genre in attributes["genres"]:
+                genre_mask |= attributes["genres"][genre]
+        mask &= genre_mask
+    return mask
+
+def concat_attribute_indexes(first, second):
+    """Attribute index for the rows of `first` followed by the rows of `second`."""
+    genres = {}
+    for label in list(first["genres"]) + [g for g in second["genres"] if g not in first["genres"]]:
+        genres[label] = np.concatenate([
+            first["genres"].get(label, np.zeros(first["size"], dtype=bool)),
+            second["genres"].get(label, np.zeros(second["size"], dtype=bool)),
+        ])
+    return {
+        "size": first["size"] + second["size"],
+        "price": np.concatenate([first["price"], second["price"]]),
+        "year": np.concatenate([first["year"], second["year"]]),
+        "genres": genres,
+    }
+
+def _release_ids(df):
+    if "Discogs_Release_ID" in df:
+        return pd.to_numeric(df["Discogs_Release_ID"], errors="coerce").to_numpy(dtype="float64")
+    return np.full(len(df), np.nan)
 
 class TasteRecommender:
     def __init__(self):
         self.index = None
         self.collection_df = None
+        self.attributes = None
+        self.genre_labels = None
+        self.release_ids = None
+        self.year_range = None
         self.ids = []
 
-    def fit(self, df):
+    def fit(self, df, quantization=None):
+        """quantization: None (float32), "fp16", "int8" or "pq" codes in the index."""
         self.collection_df = df.copy()
-        genre_matrix, _ = build_genre_embedding(df['Genre'])
+        genre_matrix, self.genre_labels = build_genre_embedding(df['Genre'])
         year_vector = build_year_embedding(df['Year'])
         vectors = np.hstack([genre_matrix, year_vector]).astype('float32')
+        self.year_range = (df['Year'].min(), df['Year'].max())
 
         self.ids = df.index.tolist()
-        self.index = faiss.IndexFlatIP(vectors.shape[1])  # cosine similarity
+        self.attributes = build_attribute_index(df)
+        self.release_ids = _release_ids(df)
         faiss.normalize_L2(vectors)
+        self.index = build_index(vectors, quantization)  # cosine similarity
+
+    def embed(self, df):
+        """
+        Normalized vectors for new records in the fitted genre/year space.
+        Genres the recommender was not fitted on are ignored.
+        """
+        known = {label: i for i, label in enumerate(self.genre_labels)}
+        genre_matrix = np.zeros((len(df), len(known)), dtype='float32')
+        for row, genres in enumerate(df['Genre']):
+            for genre in str(genres).split(","):
+                if genre in known:
+                    genre_matrix[row, known[genre]] = 1.0
+        min_year, max_year = self.year_range
+        years = df['Year'].to_numpy(dtype='float32')
+        year_vector = np.zeros(len(df), dtype='float32') if max_year == min_year else (years - min_year) / (max_year - min_year)
+        vectors = np.ascontiguousarray(np.hstack([genre_matrix, year_vector.reshape(-1, 1)]), dtype='float32')
+        faiss.normalize_L2(vectors)
+        return vectors
+
+    def add(self, df):
+        """
+        Appends records to the index and its row metadata, and returns their
+        vectors. Needs an index held in memory: one loaded with mmap=True is
+        read-only, so reload with mmap=False (or refit) to grow it. Rows whose
+        index labels clash with existing ones are re-keyed by index position.
+        """
+        n = len(self.collection_df)
+        if self.collection_df.index.isin(df.index).any():
+            df = df.set_axis(pd.RangeIndex(n, n + len(df)))
+        vectors = self.embed(df)
         self.index.add(vectors)
+        self.collection_df = pd.concat([self.collection_df, df])
+        self.attributes = concat_attribute_indexes(self.attributes, build_attribute_index(df))
+        self.release_ids = np.concatenate([self.release_ids, _release_ids(df)])
+        self.ids = list(self.ids) + df.index.tolist()
+        return vectors
 
-    def recommend(self, taste_vector, top_k=5):
-        query = taste_vector.astype('float32').reshape(1, -1)
+    def search(self, taste_vector, top_k=5, filters=None):
+        """
+        Raw faiss search returning (scores, index positions). `filters` may
+        hold "price" and "year" (min, max) ranges and a "genres" list; they
+        are enforced inside the search so every returned record matches.
+        """
+        query = np.array(taste_vector, dtype='float32').reshape(1, -1)
         faiss.normalize_L2(query)
-        D, I = self.index.search(query, top_k)
-        return self.collection_df.iloc[I[0]].copy(), D[0]  # Returns matching records + scores
\ No newline at end of file
+        top_k = min(top_k, self.index.ntotal)
+
+        params = None
+        if filters:
+            mask = filter_mask(self.attributes, filters)
+            top_k = min(top_k, int(mask.sum()))
+            # The packed bitmap must outlive the search call
+            bitmap = np.packbits(mask, bitorder='little')
+            selector = faiss.IDSelectorBitmap(mask.size, faiss.swig_ptr(bitmap))
+            # IVF (product-quantized) indexes only accept their own parameter type
+            params_cls = faiss.SearchParametersIVF if isinstance(self.index, faiss.IndexIVF) else faiss.SearchParameters
+            params = params_cls(sel=selector)
+
+        if top_k == 0:
+            return np.empty(0, dtype='float32'), np.empty(0, dtype='int64')
+        D, I = self.index.search(query, top_k, params=params)
+        return D[0], I[0]
+
+    def recommend(self, taste_vector, top_k=5, filters=None):
+        D, I = self.search(taste_vector, top_k, filters)
+        return self.collection_df.iloc[I].copy(), D  # Returns matching records + scores
+
+    def save(self, path):
+        """
+        Writes the index and its row metadata to a directory. The collection
+        itself is not stored; pass it back in to load().
+        """
+        os.makedirs(path, exist_ok=True)
+        save_index(self.index, os.path.join(path, "index.faiss"))
+        pd.to_pickle({
+            "attributes": self.attributes,
+            "genre_labels": self.genre_labels,
+            "release_ids": self.release_ids,
+            "year_range": self.year_range,
+            "ids": self.ids,
+        }, os.path.join(path, "meta.pkl"))
+
+    @classmethod
+    def load(cls, path, collection_df=None, mmap=True):
+        """
+        Opens a saved recommender over collection_df (the rows it was fitted
+        on, in the same order); with mmap, workers share one copy of the index pages.
+        """
+        recommender = cls()
+        recommender.index = load_index(os.path.join(path, "index.faiss"), mmap=mmap)
+        for key, value in pd.read_pickle(os.path.join(path, "meta.pkl")).items():
+            setattr(recommender, key, value)
+        recommender.collection_df = collection_df
+        return recommender
@@ -0,0 +1,174 @@
+import os
+import re
+import time
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+import pandas as pd
+from recommender.discogs_client import search_release, REQUEST_DELAY
+
+RESOLVED_PATH = "data/resolved_releases.csv"
+
+RESOLVED_COLS = [
+    "Discogs_Release_ID", "Discogs_Title", "Discogs_Year", "Discogs_Thumb",
+    "Discogs_Community_Rating", "Discogs_MasterID", "Discogs_Want", "Discogs_Have"
+]
+
+STOPWORDS = {"the", "a", "an", "and", "lp", "vinyl", "remastered", "reissue"}
+
+# Matches roman numerals such as "ii", "iv" or "xiv" (volume and sequel markers)
+ROMAN_NUMERAL = re.compile(r"^m{0,3}(cm|cd|d?c{0,3})(xc|xl|l?x{0,3})(ix|iv|v?i{0,3})$")
+
+def normalize(text):
+    """Lowercases, strips accents and punctuation, and drops filler words."""
+    # Drop Latin accents only; other scripts keep their characters
+    text = unicodedata.normalize("NFKD", str(text))
+    text = unicodedata.normalize("NFC", re.sub(r"[\u0300-\u036f]", "", text))
+    text = re.sub(r"\(.*?\)|\[.*?\]", " ", text.casefold().replace("&", " and "))
+    tokens = re.findall(r"[^\W_]+", text)
+    # Names made only of filler words ("The The") keep them rather than vanish
+    return [t for t in tokens if t not in STOPWORDS] or tokens
+
+def release_key(artist, title):
+    """Index key for an artist/title pair, or None when either part normalizes to nothing."""
+    artist_part, title_part = " ".join(normalize(artist)), " ".join(normalize(title))
+    if not artist_part or not title_part:
+        return None
+    return artist_part + " | " + title_part
+
+def number_tokens(key):
+    """Digit and roman-numeral tokens, which must agree exactly for a fuzzy match."""
+    return {t for t in key.split() if t.isdigit() or ROMAN_NUMERAL.match(t)}
+
+def parse_search_result(result):
+    """Flattens a /database/search result into the enrichment columns."""
+    community = result.get("community", {})
+    want = community.get("want")
+    have = community.get("have")
+    return {
+        "Discogs_Release_ID": result.get("id"),
+        "Discogs_Title": result.get("title"),
+        "Discogs_Year": pd.to_numeric(result.get("year"), errors="coerce"),
+        "Discogs_Thumb": result.get("thumb"),
+        "Discogs_Community_Rating": community.get("rating", {}).get("average"),
+        "Discogs_MasterID": result.get("master_id"),
+        "Discogs_Want": int(want) if want is not None else pd.NA,
+        "Discogs_Have": int(have) if have is not None else pd.NA,
+    }
+
+class ReleaseResolver:
+    """
+    Maps (artist, title) pairs to Discogs release/master IDs. Rows are matched
+    against a local index of already-resolved pairs (exact key first, then
+    fuzzy token matching) and only the unique misses are sent to the API.
+    Resolutions are persisted so re-importing an export costs almost nothing.
+    """
+
+    def __init__(self, path=RESOLVED_PATH, threshold=0.9):
+        self.path = path
+        self.threshold = threshold
+        self.entries = {}
+        self.token_index = defaultdict(set)
+        self.api_calls = 0
+        if path and os.path.exists(path):
+            for _, row in pd.read_csv(path).iterrows():
+                self._add(row["Key"], row[RESOLVED_COLS].to_dict())
+
+    def _add(self, key, values):
+        self.entries[key] = values
+        for token in key.split():
+            if token != "|":
+                self.token_index[token].add(key)
+
+    def learn(self, df):
+        """Indexes rows that already carry a Discogs_Release_ID."""
+        if "Discogs_Release_ID" not in df:
+            return
+        known = df[df["Discogs_Release_ID"].notna()]
+        for _, row in known.iterrows():
+            key = release_key(row["Artist"], row["Title"])
+            if key is not None and key not in self.entries:
+                self._add(key, {col: row.get(col, pd.NA) for col in RESOLVED_COLS})
+
+    def match(self, artist, title):
+        """Returns the best indexed entry for an artist/title, or None."""
+        key = release_key(artist, title)
+        if key is None:
+            return None
+        if key in self.entries:
+            return self.entries[key]
+
+        # Only score keys that share at least one token with the query
+        candidates = set()
+        for token in key.split():
+            candidates |= self.token_index.get(token, set())
+        # "Led Zeppelin III" is one character from "Led Zeppelin II"
+        numbers = number_tokens(key)
+        best, best_score = None, self.threshold
+        for candidate in candidates:
+            if number_tokens(candidate) != numbers:
+                continue
+            score = SequenceMatcher(None, key, candidate).ratio()
+            if score >= best_score:
+                best, best_score = candidate, score
+        return self.entries[best] if best else None
+
+    def resolve(self, df):
+        """
+        Returns a copy of df with the Discogs_* ID columns filled in. Rows that
+        already carry a Discogs_Release_ID are left as they are, and resolved
+        values only fill columns that are missing.
+        """
+        df = df.copy()
+        for col in RESOLVED_COLS:
+            if col not in df.columns:
+                df[col] = pd.NA
+            df[col] = df[col].astype(object)
+        self.learn(df)
+
+        misses = defaultdict(list)
+        for idx, row in df.iterrows():
+            if pd.notna(row["Discogs_Release_ID"]):
+                continue
+            artist = str(row["Artist"]).strip()
+            title = str(row["Title"]).strip()
+            if not artist or not title or artist == "nan" or title == "nan":
+                continue
+            entry = self.match(artist, title)
+            if entry is None:
+                # Unkeyable rows get their own lookup instead of sharing one
+                key = release_key(artist, title)
+                misses[key if key is not None else ("row", idx)].append((idx, artist, title))
+                continue
+            self._fill(df, idx, entry)
+
+        # One API call per distinct unresolved pair, however many rows share it
+        for key, rows in misses.items():
+            _, artist, title = rows[0]
+            print(f"🔍 Searching: {artist} {title}")
+            result = search_release(title, artist)
+            self.api_calls += 1
+            time.sleep(REQUEST_DELAY)
+            if not result:
+                continue
+            values = parse_search_result(result)
+            if isinstance(key, str):
+                self._add(key, values)
+            for idx, _, _ in rows:
+                self._fill(df, idx, values)
+
+        return df
+
+    @staticmethod
+    def _fill(df, idx, values):
+        for col in RESOLVED_COLS:
+            if pd.isna(df.at[idx, col]):
+                df.at[idx, col] = values[col]
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        rows = [{"Key": key, **values} for key, values in self.entries.items()]
+        pd.DataFrame(rows, columns=["Key"] + RESOLVED_COLS).to_csv(self.path, index=False)
@@ -0,0 +1,54 @@
+import pandas as pd
+import recommender.release_resolver as release_resolver
+from recommender.release_resolver import ReleaseResolver, release_key
+
+def make_resolver(monkeypatch, results):
+    """A resolver with no persisted index whose API search returns canned results."""
+    calls = []
+
+    def fake_search(title, artist):
+        calls.append((artist, title))
+        return results.get((artist, title))
+
+    monkeypatch.setattr(release_resolver, "search_release", fake_search)
+    monkeypatch.setattr(release_resolver, "REQUEST_DELAY", 0)
+    return ReleaseResolver(path=None), calls
+
+def test_keeps_existing_release_ids(monkeypatch):
+    resolver, calls = make_resolver(monkeypatch, {})
+    df = pd.DataFrame({
+        "Artist": ["Miles Davis", "Miles Davis"],
+        "Title": ["Kind of Blue", "Kind of Blue"],
+        "Discogs_Release_ID": [111, 222],
+        "Discogs_Want": [10, 20],
+    })
+    resolved = resolver.resolve(df)
+    assert resolved["Discogs_Release_ID"].tolist() == [111, 222]
+    assert resolved["Discogs_Want"].tolist() == [10, 20]
+    assert calls == []
+
+def test_non_latin_titles_are_resolved_separately(monkeypatch):
+    resolver, calls = make_resolver(monkeypatch, {
+        ("坂本龍一", "音楽図鑑"): {"id": 1},
+        ("細野晴臣", "泰安洋行"): {"id": 2},
+    })
+    assert release_key("坂本龍一", "音楽図鑑") != release_key("細野晴臣", "泰安洋行")
+    df = pd.DataFrame({"Artist": ["坂本龍一", "細野晴臣"], "Title": ["音楽図鑑", "泰安洋行"]})
+    resolved = resolver.resolve(df)
+    assert resolved["Discogs_Release_ID"].tolist() == [1, 2]
+    assert len(calls) == 2
+
+def test_stopword_artist_keeps_its_key():
+    assert release_key("The The", "Soul Mining") == "the the | soul mining"
+    assert release_key("!!!", "Myth Takes") is None
+
+def test_sequels_do_not_fuzzy_match(monkeypatch):
+    resolver, calls = make_resolver(monkeypatch, {("Led Zeppelin", "Led Zeppelin III"): {"id": 3}})
+    resolver.learn(pd.DataFrame({
+        "Artist": ["Led Zeppelin"], "Title": ["Led Zeppelin II"], "Discogs_Release_ID": [2],
+    }))
+    assert resolver.match("Led Zeppelin", "Led Zeppelin III") is None
+    assert resolver.match("Led Zeppelin", "Led Zeppelin II (Remastered)")["Discogs_Release_ID"] == 2
+    resolved = resolver.resolve(pd.DataFrame({"Artist": ["Led Zeppelin"], "Title": ["Led Zeppelin III"]}))
+    assert resolved["Discogs_Release_ID"].tolist() == [3]
+    assert calls == [("Led Zeppelin", "Led Zeppelin III")]